@@ -0,0 +1,69 @@
+import string
+import argparse
+import time
+from typing import List, Callable
+from reddit_stream import iter_titles
+from tokenizer import tokenize_titles, tokenize_flat
+
+
+def legacy_title_into_keywords(titles_list: List[str]) -> List[List[str]]:
+    """
+    The original per-title implementation, kept here as the benchmark baseline.
+    """
+    processed_titles_list = []
+
+    for title in titles_list:
+        clean_title = title.translate(str.maketrans('', '', string.punctuation)).lower()
+        words = clean_title.split()
+        processed_title = [word for word in words if word.isalpha()]
+        processed_titles_list.append(processed_title)
+
+    return processed_titles_list
+
+
+def best_time(func: Callable[[List[str]], list], titles: List[str], repeat: int) -> float:
+    """
+    Best wall-clock time of func over the titles out of repeat runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(titles)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tokens/sec of the batch tokenizer against the original title_into_keywords.")
+    parser.add_argument('-i', '--input', required=True, nargs='+', help="Input JSON files to take titles from")
+    parser.add_argument('-r', '--repeat', type=int, default=5, help="Number of timed runs per implementation (best is reported)")
+    parser.add_argument('--scale', type=int, default=20, help="Replicate the titles this many times to get a larger sample")
+
+    args = parser.parse_args()
+
+    titles = [title for page in args.input for title in iter_titles(page)] * args.scale
+
+    # All implementations must agree before their speed means anything
+    expected = legacy_title_into_keywords(titles)
+    assert tokenize_titles(titles) == expected
+    assert tokenize_flat(titles) == [word for title in expected for word in title]
+    num_tokens = sum(len(title) for title in expected)
+
+    implementations = [
+        ("legacy title_into_keywords", legacy_title_into_keywords),
+        ("tokenize_titles", tokenize_titles),
+        ("tokenize_titles (interned)", lambda batch: tokenize_titles(batch, intern=True)),
+        ("tokenize_flat", tokenize_flat),
+    ]
+
+    print(f"{len(titles)} titles, {num_tokens} tokens")
+    baseline = None
+    for name, func in implementations:
+        seconds = best_time(func, titles, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<28} {num_tokens / seconds:>14,.0f} tokens/sec  ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 benchmark_tokenizer.py -i archery.json baking.json blacksmithing.json fencing.json gameOfThrones.json minecraft.json
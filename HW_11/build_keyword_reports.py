@@ -0,0 +1,123 @@
+import argparse
+import math
+from typing import Any, Dict, List, Union
+from ranking import top_k_items
+from token_cache import DEFAULT_CACHE_SIZE_MB
+from cli_args import add_common_args, add_engine_arg, stopword_files
+from build_tfidf_word_list import (build_word_freq_lists, build_document_frequency_index, dict_tfidf_lists,
+                                   write_tfidf_lists)
+from tfidf_sparse import sparse_tfidf_lists
+
+
+def frequency_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str], top_k: int = 10) -> Dict[str, List[List[Any]]]:
+    """
+    Rank words by raw frequency, the same ranking build_naive_frequent_word_list.py produces.
+    """
+    return {page: [[word, count] for word, count in top_k_items(freq_lists[page], top_k)] for page in subreddits}
+
+
+def sublinear_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str], df_index: Dict[str, Any],
+                          top_k: int = 10) -> Dict[str, List[List[Any]]]:
+    """
+    Rank words by sublinear TF-IDF, (1 + log tf) * log(N / df), which damps words repeated many times.
+    """
+    num_documents = df_index["num_documents"]
+    document_frequency = df_index["document_frequency"]
+    result = {}
+
+    for page in subreddits:
+        scores = {word: (1 + math.log(tf)) * math.log(num_documents / document_frequency[word])
+                  for word, tf in freq_lists[page].items()}
+        result[page] = [[word, score] for word, score in top_k_items(scores, top_k)]
+
+    return result
+
+
+def bm25_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str], df_index: Dict[str, Any],
+               top_k: int = 10, k1: float = 1.2, b: float = 0.75) -> Dict[str, List[List[Any]]]:
+    """
+    Rank words with Okapi BM25 weighting: a saturating term frequency normalized by
+    subreddit length (k1, b) times the smoothed IDF log((N - df + 0.5) / (df + 0.5) + 1).
+    """
+    num_documents = df_index["num_documents"]
+    document_frequency = df_index["document_frequency"]
+    lengths = {page: sum(freq_lists[page].values()) for page in subreddits}
+    average_length = (sum(lengths.values()) / len(subreddits)) or 1
+    result = {}
+
+    for page in subreddits:
+        length_norm = k1 * (1 - b + b * lengths[page] / average_length)
+        scores = {}
+        for word, tf in freq_lists[page].items():
+            doc_count = document_frequency[word]
+            idf = math.log((num_documents - doc_count + 0.5) / (doc_count + 0.5) + 1)
+            scores[word] = idf * tf * (k1 + 1) / (tf + length_norm)
+        result[page] = [[word, score] for word, score in top_k_items(scores, top_k)]
+
+    return result
+
+
+def build_keyword_reports(subreddits: List[str], reports: Dict[str, str], stopwords_files: Union[str, List[str], None], top_k: int = 10,
+                          stream: bool = False, jobs: int = 1, fold_case: bool = True, cache_dir: str = None,
+                          cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, engine: str = 'dict', k1: float = 1.2, b: float = 0.75):
+    """
+    Load and tokenize every subreddit once, then write each requested ranking from the shared counts.
+
+    Args:
+        subreddits (List[str]): List of subreddit JSON filenames.
+        reports (dict): Output file per report name ('frequency', 'tfidf', 'sublinear', 'bm25').
+        stopwords_files (List[str]): Paths to files containing stopwords.
+        top_k (int): Number of top words to keep for each subreddit.
+        stream, jobs, fold_case, cache_dir, cache_size_mb: As for build_word_freq_lists.
+        engine (str): TF-IDF scorer, 'dict' or 'sparse'.
+        k1 (float), b (float): BM25 term saturation and length normalization parameters.
+    """
+    # The only pass over the input files
+    freq_lists = build_word_freq_lists(subreddits, stopwords_files, stream, jobs, fold_case, cache_dir, cache_size_mb)
+    df_index = build_document_frequency_index(freq_lists, subreddits)
+
+    if 'frequency' in reports:
+        write_tfidf_lists(frequency_lists(freq_lists, subreddits, top_k), reports['frequency'], "Frequency report")
+
+    if 'tfidf' in reports:
+        if engine == 'sparse':
+            tfidf = sparse_tfidf_lists(freq_lists, subreddits, None, top_k)
+        else:
+            tfidf = dict_tfidf_lists(freq_lists, subreddits, df_index, top_k)
+        write_tfidf_lists(tfidf, reports['tfidf'], "TF-IDF report")
+
+    if 'sublinear' in reports:
+        write_tfidf_lists(sublinear_tfidf_lists(freq_lists, subreddits, df_index, top_k), reports['sublinear'], "Sublinear TF-IDF report")
+
+    if 'bm25' in reports:
+        write_tfidf_lists(bm25_lists(freq_lists, subreddits, df_index, top_k, k1, b), reports['bm25'], "BM25 report")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank title keywords of the given subreddits with several methods from a single pass over the files.")
+
+    parser.add_argument('--frequency', help="Output JSON file for the raw frequency ranking")
+    parser.add_argument('--tfidf', help="Output JSON file for the TF-IDF ranking")
+    parser.add_argument('--sublinear', help="Output JSON file for the sublinear TF-IDF ranking, (1 + log tf) * idf")
+    parser.add_argument('--bm25', help="Output JSON file for the BM25 ranking")
+    parser.add_argument('-i', '--input', required=True, nargs='+', help="Input JSON files")
+    add_common_args(parser)
+    add_engine_arg(parser)
+    parser.add_argument('--bm25-k1', type=float, default=1.2, help="BM25 term frequency saturation")
+    parser.add_argument('--bm25-b', type=float, default=0.75, help="BM25 document length normalization")
+
+    args = parser.parse_args()
+
+    reports = {name: out_json for name, out_json in [('frequency', args.frequency), ('tfidf', args.tfidf),
+                                                     ('sublinear', args.sublinear), ('bm25', args.bm25)] if out_json}
+    if not reports:
+        parser.error("request at least one of --frequency, --tfidf, --sublinear or --bm25")
+
+    build_keyword_reports(args.input, reports, stopword_files(args), args.top_k, args.stream, args.jobs,
+                          not args.keep_stopword_case, args.cache_dir, args.cache_size_mb, args.engine,
+                          args.bm25_k1, args.bm25_b)
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 build_keyword_reports.py --frequency naive_with_stops.json --tfidf tfidf_with_stops.json -s stopwords.txt -i archery.json baking.json blacksmithing.json fencing.json gameOfThrones.json minecraft.json
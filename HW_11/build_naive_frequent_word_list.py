@@ -1,13 +1,29 @@
-import string
 import argparse
 import json
-from typing import List
-
-def get_page_titles(page: str) -> List[List[str]]:
+from collections import Counter
+from functools import partial
+from typing import AbstractSet, List, Union, Iterator, Iterable
+from reddit_stream import iter_titles
+from parallel import map_pages
+from ranking import top_k_items
+from tokenizer import tokenize_titles, batched
+from stopwords import load_stopwords
+from cli_args import add_common_args, stopword_files
+from token_cache import cached_word_counts, DEFAULT_CACHE_SIZE_MB
+
+def get_page_titles(page: str, stream: bool = False,
+                    stopwords: AbstractSet[str] = frozenset(), raise_errors: bool = False) -> Iterable[List[str]]:
     """
     Extracts titles from a JSON file, processes them into keywords, 
-    and returns a list of keyword lists.
+    and returns a list of keyword lists. Stopwords are removed while tokenizing.
+
+    With stream=True the file is read incrementally and the keyword lists are
+    yielded one post at a time instead, so memory stays flat for huge dumps.
+    With raise_errors, a missing or malformed file raises instead of yielding no titles.
     """
+    if stream:
+        return stream_page_titles(page, stopwords, raise_errors)
+
     titles_list = []
     
     try:
@@ -22,75 +38,87 @@ def get_page_titles(page: str) -> List[List[str]]:
                 titles_list.append(title)
     
     except (FileNotFoundError, json.JSONDecodeError) as e:
+        if raise_errors:
+            raise
         print(f"Error reading the JSON file: {e}")
         return []  
     
     # Process the extracted titles into keywords
-    return title_into_keywords(titles_list)
+    return tokenize_titles(titles_list, stopwords=stopwords)
 
 
-def title_into_keywords(titles_list: List[str]) -> List[List[str]]:
+def stream_page_titles(page: str, stopwords: AbstractSet[str] = frozenset(),
+                       raise_errors: bool = False) -> Iterator[List[str]]:
     """
-    Process a list of titles into a list of keyword lists.
+    Lazily yield the keyword list of each post in a (possibly concatenated,
+    JSON Lines or compressed) Reddit listing dump.
     """
-    processed_titles_list = []
-    
-    for title in titles_list:
-        # Remove punctuation, convert to lowercase
-        clean_title = title.translate(str.maketrans('', '', string.punctuation)).lower()
-        
-        # Split the cleaned title into words
-        words = clean_title.split()
-        
-        # Filter out non-alphabetic words
-        processed_title = [word for word in words if word.isalpha()]
-        
-        # Append the processed title (as list of words)
-        processed_titles_list.append(processed_title)
-    
-    return processed_titles_list
+    try:
+        # Titles are tokenized in batches as they are read, so the batch tokenizer still applies
+        for titles in batched(iter_titles(page)):
+            yield from tokenize_titles(titles, stopwords=stopwords)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        if raise_errors:
+            raise
+        print(f"Error reading the JSON file: {e}")
 
 
-def stopword_file_to_list(sw_file: str) -> List[str]:
+def count_page_words(page: str, stopwords: AbstractSet[str], stream: bool = False, cache_dir: str = None,
+                     cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, raise_errors: bool = False) -> Counter:
     """
-    Load stopwords from a file into a list.
+    Count the keywords of one subreddit JSON file, leaving out stopwords.
+    Runs inside a worker process when --jobs is greater than 1.
+
+    With a cache_dir, counts are looked up by file content hash first, so
+    a file that was already counted is not parsed or tokenized again.
     """
-    word_list = []
-    with open(sw_file, 'r') as stopwords:
-        for line in stopwords:
-            word_list.append(line.strip())
-    return word_list
+    if cache_dir:
+        # Counts are cached before stopword removal, so runs with and without -s share one entry.
+        # A failed read raises out of cached_word_counts, so its empty result is never cached
+        count_all_words = partial(count_page_words, stopwords=frozenset(), stream=stream, raise_errors=True)
+        try:
+            word_count = cached_word_counts(page, count_all_words, cache_dir, cache_size_mb, stream)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading the JSON file: {e}")
+            return Counter()
+        if not stopwords:
+            return word_count
+        return Counter({word: count for word, count in word_count.items() if word not in stopwords})
+
+    word_count = Counter()
+    
+    # Count title by title, without flattening into one big list of words
+    for title in get_page_titles(page, stream, stopwords, raise_errors):
+        word_count.update(title)
+    
+    return word_count
 
 
-def build_word_lists(subreddits: List[str], stopwords_file: str, out_json: str):
+def build_word_lists(subreddits: List[str], stopwords_files: Union[str, List[str], None], out_json: str, stream: bool = False, jobs: int = 1,
+                     fold_case: bool = True, top_k: int = 10, cache_dir: str = None,
+                     cache_size_mb: int = DEFAULT_CACHE_SIZE_MB):
     """
     Build a word frequency list for each subreddit JSON file, 
     and output a dictionary of word frequency.
 
-    If a stopwords file is provided (not None), exclude those words from the ranking.
+    If stopwords files are provided (a list of paths, a single path or None), exclude those words from the ranking
+    (lowercased to match the keywords unless fold_case is False).
+    If stream is set, input files are read incrementally (see get_page_titles).
+    With jobs > 1, files are parsed and counted in that many worker processes.
+    Only the top_k most frequent words of each subreddit are kept.
+    With a cache_dir, per-file counts are reused across runs (see token_cache.py).
     """
     result = {}
 
-    # Load stopwords once
-    stopwords = stopword_file_to_list(stopwords_file) if stopwords_file else []
+    # Load stopwords once, as a set so every token is checked in constant time
+    stopwords = load_stopwords(stopwords_files, fold_case)
 
-    for page in subreddits:
-        # Get processed titles
-        titles_keywords = get_page_titles(page)
-        
-        # Flatten the list of lists into list of words
-        all_words = [word for title in titles_keywords for word in title]
-        
-        # Count word frequencies
-        word_count = {}
-        for word in all_words:
-            word_count[word] = word_count.get(word, 0) + 1
-        
-        # Filter out stopwords
-        filtered_word_count = {word: count for word, count in word_count.items() if word not in stopwords}
-        
-        # Rank words by frequency
-        ranked_words = sorted(filtered_word_count.items(), key=lambda x: x[1], reverse=True)[0:10]
+    # Counts come back in input order whether they were computed here or in workers
+    count_page = partial(count_page_words, stopwords=stopwords, stream=stream, cache_dir=cache_dir,
+                         cache_size_mb=cache_size_mb)
+    for page, word_count in zip(subreddits, map_pages(count_page, subreddits, jobs)):
+        # Rank words by frequency, keeping only the top k
+        ranked_words = top_k_items(word_count, top_k)
 
         # Add to result
         result[page] = [[word, count] for word, count in ranked_words]
@@ -108,12 +136,13 @@ def main():
     parser = argparse.ArgumentParser(description="Determine frequency of title keywords in given list of subreddits")
 
     parser.add_argument('-o', '--output', required=True, help="Output JSON file name")
-    parser.add_argument('-s', '--stopwords', help="A text file of newline-delimited stopwords to exclude from the frequency counting")
     parser.add_argument('-i', '--input', required=True, nargs='+', help="Input JSON files")
+    add_common_args(parser)
 
     args = parser.parse_args()
 
-    build_word_lists(args.input, args.stopwords, args.output)
+    build_word_lists(args.input, stopword_files(args), args.output, args.stream, args.jobs, not args.keep_stopword_case, args.top_k,
+                     args.cache_dir, args.cache_size_mb)
 
 
 if __name__ == "__main__":
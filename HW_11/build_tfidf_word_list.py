@@ -1,15 +1,34 @@
-import string
 import argparse
 import json
 import math
-from typing import List, Dict
+from collections import Counter
+from functools import partial
+from typing import AbstractSet, List, Union, Dict, Any, Iterator, Iterable
+from reddit_stream import iter_titles
+from parallel import map_pages
+from ranking import top_k_items
+from tfidf_sparse import sparse_tfidf_lists
+from corpus_state import (new_corpus_state, load_corpus_state, save_corpus_state, put_document,
+                          remove_document, stale_documents, stopwords_fingerprint)
+from tokenizer import tokenize_titles, batched
+from stopwords import load_stopwords
+from cli_args import add_common_args, add_engine_arg, stopword_files
+from token_cache import cached_word_counts, DEFAULT_CACHE_SIZE_MB
 
 
-def get_page_titles(page: str) -> List[List[str]]:
+def get_page_titles(page: str, stream: bool = False,
+                    stopwords: AbstractSet[str] = frozenset(), raise_errors: bool = False) -> Iterable[List[str]]:
     """
     Extracts titles from a JSON file, processes them into keywords, 
-    and returns a list of keyword lists.
+    and returns a list of keyword lists. Stopwords are removed while tokenizing.
+
+    With stream=True the file is read incrementally and the keyword lists are
+    yielded one post at a time instead, so memory stays flat for huge dumps.
+    With raise_errors, a missing or malformed file raises instead of yielding no titles.
     """
+    if stream:
+        return stream_page_titles(page, stopwords, raise_errors)
+
     titles_list = []
     
     try:
@@ -24,90 +43,155 @@ def get_page_titles(page: str) -> List[List[str]]:
                 titles_list.append(title)
     
     except (FileNotFoundError, json.JSONDecodeError) as e:
+        if raise_errors:
+            raise
         print(f"Error reading the JSON file: {e}")
         return []  
     
     # Process the extracted titles into keywords
-    return title_into_keywords(titles_list)
+    return tokenize_titles(titles_list, stopwords=stopwords)
 
 
-def title_into_keywords(titles_list: List[str]) -> List[List[str]]:
+def stream_page_titles(page: str, stopwords: AbstractSet[str] = frozenset(),
+                       raise_errors: bool = False) -> Iterator[List[str]]:
     """
-    Process a list of titles into a list of keyword lists.
+    Lazily yield the keyword list of each post in a (possibly concatenated,
+    JSON Lines or compressed) Reddit listing dump.
     """
-    processed_titles_list = []
-    
-    for title in titles_list:
-        # Remove punctuation, convert to lowercase
-        clean_title = title.translate(str.maketrans('', '', string.punctuation)).lower()
-        
-        # Split the cleaned title into words
-        words = clean_title.split()
-        
-        # Filter out non-alphabetic words
-        processed_title = [word for word in words if word.isalpha()]
-        
-        # Append the processed title (as list of words)
-        processed_titles_list.append(processed_title)
-    
-    return processed_titles_list
+    try:
+        # Titles are tokenized in batches as they are read, so the batch tokenizer still applies
+        for titles in batched(iter_titles(page)):
+            yield from tokenize_titles(titles, stopwords=stopwords)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        if raise_errors:
+            raise
+        print(f"Error reading the JSON file: {e}")
 
 
-def stopword_file_to_list(sw_file: str) -> List[str]:
+def count_page_words(page: str, stopwords: AbstractSet[str], stream: bool = False, cache_dir: str = None,
+                     cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, raise_errors: bool = False) -> Counter:
     """
-    Load stopwords from a file into a list.
+    Count the keywords of one subreddit JSON file, leaving out stopwords.
+    Runs inside a worker process when --jobs is greater than 1.
+
+    With a cache_dir, counts are looked up by file content hash first, so
+    a file that was already counted is not parsed or tokenized again.
     """
-    word_list = []
-    with open(sw_file, 'r') as stopwords:
-        for line in stopwords:
-            word_list.append(line.strip())
-    return word_list
+    if cache_dir:
+        # Counts are cached before stopword removal, so runs with and without -s share one entry.
+        # A failed read raises out of cached_word_counts, so its empty result is never cached
+        count_all_words = partial(count_page_words, stopwords=frozenset(), stream=stream, raise_errors=True)
+        try:
+            word_count = cached_word_counts(page, count_all_words, cache_dir, cache_size_mb, stream)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading the JSON file: {e}")
+            return Counter()
+        if not stopwords:
+            return word_count
+        return Counter({word: count for word, count in word_count.items() if word not in stopwords})
+
+    word_count = Counter()
+    
+    # Count title by title, without flattening into one big list of words
+    for title in get_page_titles(page, stream, stopwords, raise_errors):
+        word_count.update(title)
+    
+    return word_count
 
 
-def build_word_freq_lists(subreddits: List[str], stopwords_file: str) -> Dict[str, Dict[str, int]]:
+def build_word_freq_lists(subreddits: List[str], stopwords_files: Union[str, List[str], None], stream: bool = False,
+                          jobs: int = 1, fold_case: bool = True, cache_dir: str = None,
+                          cache_size_mb: int = DEFAULT_CACHE_SIZE_MB) -> Dict[str, Dict[str, int]]:
     """
     Build a word frequency list for each subreddit JSON file.
 
     Args:
         subreddits (List[str]): List of subreddit JSON filenames.
-        stopwords_file (str): Path to a file containing stopwords.
+        stopwords_files (List[str]): Paths to files containing stopwords (a single path or None also work).
+        stream (bool): Read input files incrementally (see get_page_titles).
+        jobs (int): Number of worker processes used to parse and count the files.
+        fold_case (bool): Lowercase the stopwords to match the lowercased keywords.
+        cache_dir (str): Optional directory of cached per-file counts (see token_cache.py).
+        cache_size_mb (int): Size cap of the cache directory.
 
     Returns:
         dict: A dictionary of word frequencies for each subreddit.
     """
     result = {}
 
-    # Load stopwords once
-    stopwords = stopword_file_to_list(stopwords_file) if stopwords_file else []
+    # Load stopwords once, as a set so every token is checked in constant time
+    stopwords = load_stopwords(stopwords_files, fold_case)
 
-    for page in subreddits:
-        # Get processed titles
-        titles_keywords = get_page_titles(page)
-        
-        # Flatten the list of lists into a list of words
-        all_words = [word for title in titles_keywords for word in title if word not in stopwords]
-        
-        # Count word frequencies
-        word_count = {}
-        for word in all_words:
-            word_count[word] = word_count.get(word, 0) + 1
-        
+    # Counts come back in input order whether they were computed here or in workers
+    count_page = partial(count_page_words, stopwords=stopwords, stream=stream, cache_dir=cache_dir,
+                         cache_size_mb=cache_size_mb)
+    for page, word_count in zip(subreddits, map_pages(count_page, subreddits, jobs)):
         # Add word counts to the result for this subreddit
         result[page] = word_count
     
     return result  # A dictionary to facilitate TF-IDF calculation
 
 
-def build_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str], out_json: str):
+def build_document_frequency_index(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str]) -> Dict[str, Any]:
     """
-    Calculate TF-IDF scores for words in subreddit JSON files and save the output to a file.
+    Build an inverted word -> document count index in a single pass over the frequency lists.
+
+    Args:
+        freq_lists (dict): A dictionary of word frequencies for each subreddit.
+        subreddits (List[str]): List of subreddit JSON filenames (the documents).
+
+    Returns:
+        dict: {"num_documents": N, "document_frequency": {word: number of subreddits containing it}}
+    """
+    document_frequency = {}
+
+    # Every word of every subreddit is touched exactly once, so this is linear in the corpus size
+    for page in subreddits:
+        for word in freq_lists[page]:
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    return {"num_documents": len(subreddits), "document_frequency": document_frequency}
+
+
+def save_document_frequency_index(df_index: Dict[str, Any], index_file: str):
+    """
+    Save a document frequency index to a JSON file so it can be reused by later runs.
+    """
+    try:
+        with open(index_file, 'w', encoding='utf-8') as output_file:
+            json.dump(df_index, output_file)
+        print(f"Document frequency index written to {index_file}")
+    except Exception as e:
+        print(f"Error writing to index file: {e}")
+
+
+def load_document_frequency_index(index_file: str) -> Dict[str, Any]:
+    """
+    Load a document frequency index previously written by save_document_frequency_index.
+    """
+    with open(index_file, 'r', encoding='utf-8') as input_file:
+        return json.load(input_file)
+
+
+def dict_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str],
+                     df_index: Dict[str, Any] = None, top_k: int = 10) -> Dict[str, List[List[Any]]]:
+    """
+    Calculate TF-IDF scores word by word with plain dictionaries and keep the top k words of each subreddit.
 
     Args:
         freq_lists (dict): A dictionary of word frequencies for each subreddit.
         subreddits (List[str]): List of subreddit JSON filenames.
-        out_json (str): Path to the output JSON file.
+        df_index (dict): Optional document frequency index, built from freq_lists if not provided.
+        top_k (int): Number of top words to keep for each subreddit.
+
+    Returns:
+        dict: {subreddit: [[word, score], ...]}
     """
-    num_documents = len(subreddits)
+    if df_index is None:
+        df_index = build_document_frequency_index(freq_lists, subreddits)
+
+    num_documents = df_index["num_documents"]
+    document_frequency = df_index["document_frequency"]
     result = {}
 
     # Iterate over each subreddit
@@ -120,9 +204,9 @@ def build_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[st
         
         # Calculate TF-IDF for each word
         for word, tf in word_frequencies.items():
-            # Count how many documents (subreddits) contain this word
-            doc_count = sum(1 for page in subreddits 
-                            if word in freq_lists[page])
+            # Look up how many documents (subreddits) contain this word,
+            # a word missing from a loaded index is treated as appearing in a single document
+            doc_count = document_frequency.get(word, 1)
             
             # Calculate IDF
             idf = math.log(num_documents / doc_count)
@@ -130,33 +214,153 @@ def build_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[st
             # Compute TF-IDF
             tfidf_scores[word] = tf * idf
         
-        # Get the top 10 words by TF-IDF scores
-        top_tfidf = sorted(tfidf_scores.items(), key=lambda x: x[1], reverse=True)[0:10]
+        # Get the top k words by TF-IDF scores
+        top_tfidf = top_k_items(tfidf_scores, top_k)
         result[subreddit] = [[word, score] for word, score in top_tfidf]
 
-    # Save the result to the output JSON file
+    return result
+
+
+def write_tfidf_lists(result: Dict[str, List[List[Any]]], out_json: str, label: str = "TF-IDF scores"):
+    """
+    Save TF-IDF rankings (or any {subreddit: [[word, score], ...]} ranking, named by label) to the output JSON file.
+    """
     try:
         with open(out_json, 'w', encoding='utf-8') as output_file:
             json.dump(result, output_file, indent=4)
-        print(f"TF-IDF scores written to {out_json}")
+        print(f"{label} written to {out_json}")
     except Exception as e:
         print(f"Error writing to output file: {e}")
 
 
+def build_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str], out_json: str,
+                      df_index: Dict[str, Any] = None, top_k: int = 10,
+                      engine: str = 'dict') -> Dict[str, List[List[Any]]]:
+    """
+    Calculate TF-IDF scores for words in subreddit JSON files and save the output to a file.
+
+    Args:
+        freq_lists (dict): A dictionary of word frequencies for each subreddit.
+        subreddits (List[str]): List of subreddit JSON filenames.
+        out_json (str): Path to the output JSON file.
+        df_index (dict): Optional document frequency index, built from freq_lists if not provided.
+        top_k (int): Number of top words to keep for each subreddit.
+        engine (str): 'dict' for the pure Python scorer, 'sparse' for the NumPy/SciPy matrix scorer.
+
+    Returns:
+        dict: The rankings that were written, {subreddit: [[word, score], ...]}
+    """
+    if engine == 'sparse':
+        result = sparse_tfidf_lists(freq_lists, subreddits, df_index, top_k)
+    else:
+        result = dict_tfidf_lists(freq_lists, subreddits, df_index, top_k)
+
+    # Save the result to the output JSON file
+    write_tfidf_lists(result, out_json)
+    return result
+
+
+def update_tfidf_state(state: Dict[str, Any], freq_lists: Dict[str, Dict[str, int]], removed: List[str],
+                       top_k: int) -> Dict[str, List[List[Any]]]:
+    """
+    Fold new or replaced documents into a saved corpus state (and drop removed ones),
+    then re-score only the documents whose ranking can have changed.
+
+    Args:
+        state (dict): Corpus state, see corpus_state.py. Updated in place.
+        freq_lists (dict): Word frequencies of the documents to add or replace.
+        removed (List[str]): Documents to drop from the corpus.
+        top_k (int): Number of top words to keep for each subreddit.
+
+    Returns:
+        dict: The rankings of every document in the corpus, {subreddit: [[word, score], ...]}
+    """
+    num_documents = len(state["documents"])
+    changed_words = set()
+
+    for page in removed:
+        changed_words |= remove_document(state, page)
+    for page, word_count in freq_lists.items():
+        changed_words |= put_document(state, page, word_count)
+
+    # A different k changes every ranking, just like a different number of documents does
+    everything_stale = len(state["documents"]) != num_documents or state["top_k"] != top_k
+    stale = stale_documents(state, freq_lists.keys(), changed_words, everything_stale)
+    state["top_k"] = top_k
+
+    # Score the stale documents against the whole corpus through its document-frequency table
+    df_index = {"num_documents": len(state["documents"]), "document_frequency": state["document_frequency"]}
+    state["rankings"].update(dict_tfidf_lists(state["documents"], stale, df_index, top_k))
+    print(f"Re-scored {len(stale)} of {len(state['documents'])} documents")
+
+    return {page: state["rankings"][page] for page in state["documents"]}
+
+
 def main():
     parser = argparse.ArgumentParser(description="Determine TF-IDF scores of title keywords in given list of subreddits.")
 
     parser.add_argument('-o', '--output', required=True, help="Output JSON file name")
-    parser.add_argument('-s', '--stopwords', help="A text file of newline-delimited stopwords to exclude from the frequency counting")
-    parser.add_argument('-i', '--input', required=True, nargs='+', help="Input JSON files")
+    parser.add_argument('-i', '--input', nargs='+', default=[], help="Input JSON files")
+    add_common_args(parser)
+    add_engine_arg(parser)
+    parser.add_argument('--index', help="Score against a previously saved document frequency index instead of building one from the inputs")
+    parser.add_argument('--save-index', help="Save the document frequency index built from the inputs to this JSON file")
+    parser.add_argument('--state', help="Corpus state file (per-document counts, document frequencies and rankings) to write, or to update with --update")
+    parser.add_argument('--update', action='store_true', help="Add or replace the input documents in --state instead of rebuilding the whole corpus")
+    parser.add_argument('--remove', nargs='+', default=[], help="Documents to remove from --state (with --update)")
 
     args = parser.parse_args()
 
+    if args.update and not args.state:
+        parser.error("--update requires --state")
+    if args.update and (args.engine != 'dict' or args.index or args.save_index):
+        parser.error("--update always scores with the dict engine against the state's own document frequencies, "
+                     "it cannot be combined with --engine sparse, --index or --save-index")
+    if args.state and args.index:
+        parser.error("--state cannot be combined with --index, the saved state must hold the document frequencies of its own documents")
+    if not args.input and not (args.update and args.remove):
+        parser.error("the following arguments are required: -i/--input")
+
+    stopwords_files = stopword_files(args)
+    stopwords = load_stopwords(stopwords_files, not args.keep_stopword_case)
+
+    if args.update:
+        # Check the saved state before tokenizing anything, so a mismatch fails fast
+        state = load_corpus_state(args.state)
+        if state["stopwords"] != stopwords_fingerprint(stopwords):
+            print(f"Error: {args.state} was built with a different stopword list, rebuild it without --update")
+            return
+
     # Build word frequency lists
-    freq_lists = build_word_freq_lists(args.input, args.stopwords)
+    freq_lists = build_word_freq_lists(args.input, stopwords_files, args.stream, args.jobs, not args.keep_stopword_case,
+                                       args.cache_dir, args.cache_size_mb)
+
+    if args.update:
+        # Only the new documents were read, everything else comes from the saved state
+        write_tfidf_lists(update_tfidf_state(state, freq_lists, args.remove, args.top_k), args.output)
+        save_corpus_state(state, args.state)
+        return
+
+    # Build (or load) the document frequency index once, so scoring never rescans other subreddits.
+    # The sparse engine counts document frequencies on its own matrix unless an index is given
+    df_index = None
+    if args.index:
+        df_index = load_document_frequency_index(args.index)
+    elif args.save_index or args.engine == 'dict':
+        df_index = build_document_frequency_index(freq_lists, args.input)
+
+    if args.save_index:
+        save_document_frequency_index(df_index, args.save_index)
 
     # Build TF-IDF lists and write to output file
-    build_tfidf_lists(freq_lists, args.input, args.output)
+    result = build_tfidf_lists(freq_lists, args.input, args.output, df_index, args.top_k, args.engine)
+
+    if args.state:
+        state = new_corpus_state(args.top_k, stopwords)
+        for page in args.input:
+            put_document(state, page, freq_lists[page])
+        state["rankings"] = result
+        save_corpus_state(state, args.state)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import os
+import argparse
+import filecmp
+import tempfile
+from build_tfidf_word_list import build_word_freq_lists, build_tfidf_lists
+
+SUBREDDITS = ['archery.json', 'baking.json', 'blacksmithing.json', 'fencing.json', 'gameOfThrones.json', 'minecraft.json']
+
+# Reference output of each stopword setting, as produced by the original dictionary scorer
+REFERENCES = [
+    ('tfidf_no_stops.json', []),
+    ('tfidf_with_stops.json', ['stopwords.txt']),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that every TF-IDF engine reproduces the bundled reference outputs byte for byte.")
+    parser.add_argument('-i', '--input', nargs='+', default=SUBREDDITS, help="Input JSON files, in the order used for the reference outputs")
+    parser.add_argument('--engines', nargs='+', choices=['dict', 'sparse'], default=['dict', 'sparse'], help="TF-IDF engines to check")
+
+    args = parser.parse_args()
+
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for reference, stopwords_files in REFERENCES:
+            # Both engines score the same frequency lists, so only the scoring step differs
+            freq_lists = build_word_freq_lists(args.input, stopwords_files)
+            for engine in args.engines:
+                out_json = os.path.join(tmp_dir, f"{engine}_{reference}")
+                build_tfidf_lists(freq_lists, args.input, out_json, engine=engine)
+                same = filecmp.cmp(out_json, reference, shallow=False)
+                print(f"{engine:<7} {reference:<22} {'identical' if same else 'DIFFERS'}")
+                if not same:
+                    mismatches.append((engine, reference))
+
+    assert not mismatches, f"Output differs from the reference for {mismatches}"
+    print("All engines match the reference outputs")
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 check_tfidf_parity.py
@@ -0,0 +1,36 @@
+import argparse
+from typing import List
+from stopwords import language_pack_files
+from token_cache import DEFAULT_CACHE_SIZE_MB
+
+
+def add_common_args(parser: argparse.ArgumentParser):
+    """
+    Add the stopword, input reading, ranking size, worker and cache options shared by
+    build_naive_frequent_word_list.py, build_tfidf_word_list.py and build_keyword_reports.py.
+    """
+    parser.add_argument('-s', '--stopwords', nargs='+', default=[], help="Text files of newline-delimited stopwords to exclude from the frequency counting")
+    parser.add_argument('--stopword-dir', help="Language-pack directory of <language>.txt stopword files")
+    parser.add_argument('--languages', nargs='+', default=[], help="Languages to load from --stopword-dir (defaults to every pack in it)")
+    parser.add_argument('--keep-stopword-case', action='store_true', help="Match stopwords exactly instead of lowercasing them like the title keywords")
+    parser.add_argument('--stream', action='store_true', help="Read inputs incrementally with bounded memory (also accepts concatenated listings, JSON Lines and .gz/.zst files)")
+    parser.add_argument('-k', '--top-k', type=int, default=10, help="Number of top words to keep for each subreddit")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Number of worker processes used to parse and count the input files")
+    parser.add_argument('--cache-dir', help="Directory caching per-file token counts, keyed by file content, so repeat runs skip parsing")
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_CACHE_SIZE_MB, help="Size cap of --cache-dir, least recently used entries are evicted first")
+
+
+def add_engine_arg(parser: argparse.ArgumentParser):
+    """
+    Add the --engine choice of TF-IDF scorer.
+    """
+    parser.add_argument('--engine', choices=['dict', 'sparse'], default='dict', help="TF-IDF scorer: pure Python dictionaries, or a NumPy/SciPy sparse matrix for large corpora")
+
+
+def stopword_files(args: argparse.Namespace) -> List[str]:
+    """
+    The stopword files selected by -s and --stopword-dir/--languages.
+    """
+    if args.stopword_dir:
+        return args.stopwords + language_pack_files(args.stopword_dir, args.languages)
+    return args.stopwords
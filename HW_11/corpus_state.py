@@ -0,0 +1,107 @@
+import hashlib
+import json
+from typing import AbstractSet, Any, Dict, List, Set
+
+
+def stopwords_fingerprint(stopwords: AbstractSet[str]) -> str:
+    """
+    A short, order-independent fingerprint of a stopword set, stored with the corpus state
+    so documents counted with different stopwords are never mixed.
+    """
+    return hashlib.sha1('\n'.join(sorted(stopwords)).encode('utf-8')).hexdigest()
+
+
+def new_corpus_state(top_k: int, stopwords: AbstractSet[str] = frozenset()) -> Dict[str, Any]:
+    """
+    An empty corpus state: per-document term counts, the global document-frequency
+    table, and the current top-k ranking of every document.
+    """
+    return {
+        "top_k": top_k,
+        "stopwords": stopwords_fingerprint(stopwords),
+        "documents": {},
+        "document_frequency": {},
+        "rankings": {},
+    }
+
+
+def load_corpus_state(state_file: str) -> Dict[str, Any]:
+    """
+    Load a corpus state previously written by save_corpus_state.
+    """
+    with open(state_file, 'r', encoding='utf-8') as input_file:
+        return json.load(input_file)
+
+
+def save_corpus_state(state: Dict[str, Any], state_file: str):
+    """
+    Save the corpus state as compact JSON.
+    """
+    try:
+        with open(state_file, 'w', encoding='utf-8') as output_file:
+            json.dump(state, output_file, separators=(',', ':'))
+        print(f"Corpus state written to {state_file}")
+    except Exception as e:
+        print(f"Error writing to state file: {e}")
+
+
+def put_document(state: Dict[str, Any], page: str, word_count: Dict[str, int]) -> Set[str]:
+    """
+    Add a document, or replace it if it is already in the corpus.
+
+    Only the document-frequency entries of words gained or lost by the document are
+    touched. Returns those words, whose IDF (and so whose rankings) may have changed.
+    """
+    documents = state["documents"]
+    document_frequency = state["document_frequency"]
+    old_count = documents.get(page, {})
+
+    for word in old_count:
+        if word not in word_count:
+            document_frequency[word] -= 1
+            if not document_frequency[word]:
+                del document_frequency[word]
+
+    for word in word_count:
+        if word not in old_count:
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    # Replacing keeps the document's position, new documents are appended
+    documents[page] = dict(word_count)
+    return old_count.keys() ^ word_count.keys()
+
+
+def remove_document(state: Dict[str, Any], page: str) -> Set[str]:
+    """
+    Remove a document from the corpus. Returns the words whose document frequency changed.
+    """
+    word_count = state["documents"].pop(page, None)
+    if word_count is None:
+        print(f"{page} is not in the corpus, nothing to remove")
+        return set()
+
+    document_frequency = state["document_frequency"]
+    for word in word_count:
+        document_frequency[word] -= 1
+        if not document_frequency[word]:
+            del document_frequency[word]
+
+    state["rankings"].pop(page, None)
+    return set(word_count)
+
+
+def stale_documents(state: Dict[str, Any], changed_pages: AbstractSet[str], changed_words: AbstractSet[str],
+                    num_documents_changed: bool) -> List[str]:
+    """
+    List the documents whose ranking has to be recomputed after an update.
+
+    When the number of documents changes every IDF changes with it, so every document is
+    stale. Otherwise only the changed documents and those containing a word whose document
+    frequency moved need to be re-scored.
+    """
+    documents = state["documents"]
+    if num_documents_changed:
+        return list(documents)
+
+    return [page for page, word_count in documents.items()
+            if page in changed_pages or not changed_words.isdisjoint(word_count)]
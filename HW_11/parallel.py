@@ -0,0 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+
+def map_pages(func: Callable[[str], T], pages: List[str], jobs: int = 1) -> Iterator[T]:
+    """
+    Apply func to every input file and yield the results in the same order as pages.
+
+    With jobs > 1 the files are processed by a pool of worker processes; func must then
+    be a picklable top-level function (or a functools.partial of one). Results are still
+    yielded in input order, so the output never depends on which worker finishes first.
+    """
+    if jobs <= 1 or len(pages) <= 1:
+        for page in pages:
+            yield func(page)
+        return
+
+    workers = min(jobs, len(pages))
+
+    # Hand out a few files per task to amortize the inter-process overhead on big batches
+    chunksize = max(1, len(pages) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, pages, chunksize=chunksize)
@@ -0,0 +1,24 @@
+import heapq
+from operator import itemgetter
+from typing import Dict, Hashable, List, Tuple, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+def top_k_items(scores: Dict[K, V], k: int) -> List[Tuple[K, V]]:
+    """
+    Return the k highest-scoring (key, score) pairs, best first.
+
+    A bounded heap keeps only k candidates, so this is O(n log k) rather than the
+    O(n log n) of sorting everything. Ties are broken deterministically by insertion
+    order, exactly like sorted(scores.items(), key=..., reverse=True)[:k].
+    """
+    return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+
+def top_k_keys(scores: Dict[K, V], k: int) -> List[K]:
+    """
+    Return only the keys of the k highest-scoring entries, best first.
+    """
+    return [key for key, _ in top_k_items(scores, k)]
@@ -0,0 +1,210 @@
+import io
+import gzip
+import json
+from json.decoder import scanstring
+from typing import Iterator, Dict, Any, TextIO
+
+try:
+    import zstandard  # Optional, only needed for .zst archives
+except ImportError:
+    zstandard = None
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+CHUNK_SIZE = 1 << 16  # Characters read from the file at a time
+WHITESPACE = ' \t\r\n'
+
+_decoder = json.JSONDecoder()
+
+
+def open_listing(path: str) -> TextIO:
+    """
+    Open a Reddit listing dump as text, transparently decompressing gzip or zstd archives
+    (detected from the file's magic bytes rather than its extension).
+    """
+    with open(path, 'rb') as raw:
+        magic = raw.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding='utf-8')
+
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError(f"Reading {path} requires the zstandard package (pip install zstandard)")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+
+    return open(path, 'r', encoding='utf-8')
+
+
+def is_json_lines(path: str) -> bool:
+    """
+    JSON Lines dumps are recognised by their extension, ignoring a trailing compression suffix.
+    """
+    name = path.lower()
+    for suffix in ('.gz', '.zst'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.endswith(JSON_LINES_SUFFIXES)
+
+
+class _ListingScanner:
+    """
+    Walks one or more concatenated Reddit listings ({"data": {"children": [...]}} objects)
+    keeping only a small window of the file in memory. Everything outside data.children is
+    skipped character by character, and each child is decoded on its own, so memory is
+    bounded by the largest single post rather than by the size of the dump.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self, size: int = CHUNK_SIZE) -> bool:
+        # Drop what has already been consumed, then append the next chunk
+        chunk = self.stream.read(max(size, CHUNK_SIZE))
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        # Next non-whitespace character, or '' at the end of the file
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return c
+
+    def read_string(self) -> str:
+        self.expect('"')
+        while True:
+            try:
+                value, self.pos = scanstring(self.buf, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+
+    def read_value(self) -> Any:
+        # Decode one complete JSON value, reading more of the file until it fits in the buffer
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buf) or not self.fill():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                # Grow by at least the size of the partial value so huge posts are not re-parsed too often
+                if not self.fill(len(self.buf) - self.pos):
+                    raise
+
+    def skip_value(self):
+        c = self.peek()
+        if c == '{':
+            self.pos += 1
+            for _ in self.iter_object_keys():
+                self.skip_value()
+        elif c == '[':
+            self.pos += 1
+            for _ in self.iter_array():
+                self.skip_value()
+        elif c == '"':
+            self.read_string()
+        else:
+            self.read_value()  # Numbers, true, false and null are tiny
+
+    def iter_object_keys(self) -> Iterator[str]:
+        # Assumes the opening brace is consumed; yields each key, the caller consumes its value
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def iter_array(self) -> Iterator[None]:
+        # Assumes the opening bracket is consumed; yields once per element, the caller consumes it
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield None
+            if self.expect(',]') == ']':
+                return
+
+    def iter_children(self) -> Iterator[Dict[str, Any]]:
+        # Top level: any number of listings back to back
+        while self.peek():
+            self.expect('{')
+            for key in self.iter_object_keys():
+                if key != 'data' or self.peek() != '{':
+                    self.skip_value()
+                    continue
+                self.pos += 1
+                for data_key in self.iter_object_keys():
+                    if data_key != 'children' or self.peek() != '[':
+                        self.skip_value()
+                        continue
+                    self.pos += 1
+                    for _ in self.iter_array():
+                        yield self.read_value()
+
+
+def _posts_from_record(record: Any) -> Iterator[Dict[str, Any]]:
+    # A JSON Lines record may be a whole listing, a {"kind": "t3", "data": {...}} child or a bare post
+    if not isinstance(record, dict):
+        return
+    data = record.get("data")
+    if isinstance(data, dict) and isinstance(data.get("children"), list):
+        for child in data["children"]:
+            yield child.get("data", {})
+    elif isinstance(data, dict):
+        yield data
+    else:
+        yield record
+
+
+def iter_posts(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the "data" dict of every post in a Reddit listing dump, one post at a time.
+
+    Accepts a single listing, several concatenated listings, or JSON Lines (.jsonl/.ndjson),
+    each optionally gzip or zstd compressed.
+    """
+    with open_listing(path) as stream:
+        if is_json_lines(path):
+            for line in stream:
+                if line.strip():
+                    yield from _posts_from_record(json.loads(line))
+        else:
+            for child in _ListingScanner(stream).iter_children():
+                yield child.get("data", {})
+
+
+def iter_titles(path: str) -> Iterator[str]:
+    """
+    Yield the non-empty title of every post in a Reddit listing dump.
+    """
+    for post in iter_posts(path):
+        title = post.get("title", "")
+        if title:  # non-empty
+            yield title
@@ -0,0 +1,69 @@
+import os
+from typing import Dict, FrozenSet, Iterable, List, Tuple, Union
+
+STOPWORD_FILE_SUFFIX = '.txt'
+
+# Parsed stopword files keyed by (absolute path, fold_case), each stored with the
+# modification time and size it was parsed at so an edited file is read again.
+# This only saves work for library callers that load the same files more than once in one
+# process; each command line run starts with an empty cache.
+_parsed_files: Dict[Tuple[str, bool], Tuple[int, int, FrozenSet[str]]] = {}
+
+
+def load_stopword_file(sw_file: str, fold_case: bool = True) -> FrozenSet[str]:
+    """
+    Load newline-delimited stopwords from a file into a frozenset.
+
+    With fold_case the entries are lowercased, the same way the tokenizer lowercases
+    titles, so "The" in a stopword file still removes "the". Blank lines are ignored.
+    The parsed set is cached in memory and only re-read when the file changes on disk.
+    """
+    path = os.path.abspath(sw_file)
+    stat = os.stat(path)
+    key = (path, fold_case)
+
+    cached = _parsed_files.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(path, 'r', encoding='utf-8') as stopwords:
+        words = (line.strip() for line in stopwords)
+        word_set = frozenset(word.lower() if fold_case else word for word in words if word)
+
+    _parsed_files[key] = (stat.st_mtime_ns, stat.st_size, word_set)
+    return word_set
+
+
+def language_pack_files(language_dir: str, languages: Iterable[str] = ()) -> List[str]:
+    """
+    Resolve stopword files from a language-pack directory holding one <language>.txt file per language.
+    With no languages given, every pack in the directory is used.
+    """
+    if not languages:
+        return sorted(os.path.join(language_dir, name) for name in os.listdir(language_dir)
+                      if name.endswith(STOPWORD_FILE_SUFFIX))
+
+    return [os.path.join(language_dir, language + STOPWORD_FILE_SUFFIX) for language in languages]
+
+
+def stopword_file_list(sw_files: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Normalize a stopwords argument to a list of paths: a single path (the older
+    stopwords_file parameter) or None are accepted as well as a list of paths.
+    """
+    if sw_files is None:
+        return []
+    if isinstance(sw_files, str):
+        return [sw_files] if sw_files else []
+    return list(sw_files)
+
+
+def load_stopwords(sw_files: Union[str, Iterable[str], None] = (), fold_case: bool = True) -> FrozenSet[str]:
+    """
+    Load and merge one or more stopword files into a single frozenset for O(1) membership tests.
+    A single path or None is also accepted (see stopword_file_list).
+    """
+    word_set = frozenset()
+    for sw_file in stopword_file_list(sw_files):
+        word_set |= load_stopword_file(sw_file, fold_case)
+    return word_set
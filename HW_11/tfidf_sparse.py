@@ -0,0 +1,123 @@
+import math
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Only the sparse engine needs them, the dict engine is pure Python
+    np = None
+    sparse = None
+
+
+def require_sparse_backend():
+    """
+    Fail with a clear message when the optional NumPy/SciPy dependencies are missing.
+    """
+    if np is None or sparse is None:
+        raise ImportError("The sparse TF-IDF engine requires numpy and scipy (pip install numpy scipy)")
+
+
+def build_term_document_matrix(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str]) -> Tuple[List[str], Any]:
+    """
+    Build a vocabulary and a CSR term-document count matrix with one row per subreddit.
+
+    Args:
+        freq_lists (dict): A dictionary of word frequencies for each subreddit.
+        subreddits (List[str]): List of subreddit JSON filenames (the rows, in order).
+
+    Returns:
+        tuple: (vocabulary, matrix) where matrix[row, vocabulary_index[word]] is the word count.
+    """
+    require_sparse_backend()
+
+    vocabulary_index = {}
+    indices = []
+    counts = []
+    indptr = [0]
+
+    for page in subreddits:
+        # Columns stay in the subreddit's own word order (not sorted), so ties in a row
+        # can later be broken exactly like the dict engine breaks them
+        for word, count in freq_lists[page].items():
+            indices.append(vocabulary_index.setdefault(word, len(vocabulary_index)))
+            counts.append(count)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(counts, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+        shape=(len(subreddits), len(vocabulary_index)),
+    )
+    return list(vocabulary_index), matrix
+
+
+def idf_vector(matrix: Any, vocabulary: List[str], df_index: Dict[str, Any] = None) -> Any:
+    """
+    Compute the IDF of every vocabulary word as one array, log(N / document frequency).
+
+    Document frequencies come from df_index when one is given (words missing from it
+    count as appearing in a single document), otherwise from the matrix itself.
+    """
+    if df_index is None:
+        num_documents = matrix.shape[0]
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    else:
+        num_documents = df_index["num_documents"]
+        lookup = df_index["document_frequency"]
+        document_frequency = np.array([lookup.get(word, 1) for word in vocabulary], dtype=np.int64)
+
+    # Document frequencies are small integers, so tabulate math.log once per distinct value
+    # and gather; scores then match the dict engine bit for bit
+    distinct = np.unique(document_frequency)
+    table = np.array([math.log(num_documents / doc_count) for doc_count in distinct.tolist()])
+    return table[np.searchsorted(distinct, document_frequency)]
+
+
+def top_k_per_row(scores: Any, top_k: int) -> List[List[Tuple[int, float]]]:
+    """
+    Select the top k (column, score) pairs of every row of a CSR score matrix, best first.
+
+    np.argpartition finds the k-th best score in linear time; every entry at least that good
+    is then ordered by score and, for ties, by position in the row, which reproduces the
+    insertion-order tie breaking of the dict engine.
+    """
+    rows = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        data = scores.data[start:end]
+        columns = scores.indices[start:end]
+
+        if len(data) > top_k > 0:
+            threshold = data[np.argpartition(-data, top_k - 1)[top_k - 1]]
+            candidates = np.flatnonzero(data >= threshold)
+        else:
+            candidates = np.arange(len(data))
+
+        order = candidates[np.lexsort((candidates, -data[candidates]))][:max(top_k, 0)]
+        rows.append([(int(columns[i]), float(data[i])) for i in order])
+    return rows
+
+
+def sparse_tfidf_lists(freq_lists: Dict[str, Dict[str, int]], subreddits: List[str],
+                       df_index: Dict[str, Any] = None, top_k: int = 10) -> Dict[str, List[List[Any]]]:
+    """
+    Score every subreddit with TF-IDF in one batched sparse operation and keep the top k words of each.
+
+    Args:
+        freq_lists (dict): A dictionary of word frequencies for each subreddit.
+        subreddits (List[str]): List of subreddit JSON filenames.
+        df_index (dict): Optional document frequency index to take IDF values from.
+        top_k (int): Number of top words to keep for each subreddit.
+
+    Returns:
+        dict: {subreddit: [[word, score], ...]} in the same layout as the dict engine.
+    """
+    vocabulary, counts = build_term_document_matrix(freq_lists, subreddits)
+    idf = idf_vector(counts, vocabulary, df_index)
+
+    # TF * IDF for all documents at once: scale every stored count by its column's IDF
+    scores = sparse.csr_matrix((counts.data * idf[counts.indices], counts.indices, counts.indptr), shape=counts.shape)
+
+    result = {}
+    for subreddit, top_words in zip(subreddits, top_k_per_row(scores, top_k)):
+        result[subreddit] = [[vocabulary[column], score] for column, score in top_words]
+    return result
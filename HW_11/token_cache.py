@@ -0,0 +1,91 @@
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import Counter
+from typing import Callable, Optional
+from tokenizer import TOKENIZER_VERSION
+
+CACHE_SUFFIX = '.counts'
+DEFAULT_CACHE_SIZE_MB = 512
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def cache_key(page: str, stream: bool = False) -> str:
+    """
+    Key a file's cached counts by a hash of its content, the tokenizer version and the read mode,
+    so an edited input or a tokenizer change never serves stale counts. Streaming and whole-file
+    reads accept different inputs (e.g. concatenated listings), so they never share an entry.
+    """
+    read_mode = 'stream' if stream else 'whole'
+    digest = hashlib.sha256(f"tokenizer-{TOKENIZER_VERSION}\nread-{read_mode}\n".encode('utf-8'))
+    with open(page, 'rb') as raw:
+        for block in iter(lambda: raw.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached_counts(cache_dir: str, key: str) -> Optional[Counter]:
+    """
+    Return the cached word counts for key, or None on a miss. A hit refreshes the
+    entry's modification time, which is what the LRU eviction orders by.
+    """
+    path = os.path.join(cache_dir, key + CACHE_SUFFIX)
+    try:
+        with open(path, 'rb') as cached:
+            word_count = pickle.load(cached)
+        os.utime(path)
+        return word_count
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def evict_cache(cache_dir: str, max_bytes: int):
+    """
+    Delete least recently used entries until the cache fits in max_bytes.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_SUFFIX):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+            except FileNotFoundError:  # Removed by another process in the meantime
+                continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def store_cached_counts(cache_dir: str, key: str, word_count: Counter, max_bytes: int):
+    """
+    Save word counts under key in a compact binary pickle, then evict down to max_bytes.
+    The file is written under a temporary name and renamed, so parallel workers never read a partial entry.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=cache_dir, delete=False) as tmp:
+        pickle.dump(word_count, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp.name, os.path.join(cache_dir, key + CACHE_SUFFIX))
+    evict_cache(cache_dir, max_bytes)
+
+
+def cached_word_counts(page: str, count_words: Callable[[str], Counter], cache_dir: str,
+                       cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, stream: bool = False) -> Counter:
+    """
+    Return the word counts of page from the cache, or compute them with count_words and cache them.
+    stream is the read mode count_words uses. count_words must raise when the file cannot be read,
+    the error reaches the caller and nothing is cached; a missing file raises FileNotFoundError.
+    """
+    key = cache_key(page, stream)
+    word_count = load_cached_counts(cache_dir, key)
+    if word_count is None:
+        word_count = count_words(page)
+        store_cached_counts(cache_dir, key, word_count, cache_size_mb << 20)
+    return word_count
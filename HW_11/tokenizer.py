@@ -0,0 +1,86 @@
+import re
+import string
+import sys
+from itertools import filterfalse, islice
+from typing import AbstractSet, List, Iterable, Iterator
+
+# Built once at import time instead of once per title. The compiled character class deletes
+# the same characters as str.maketrans('', '', string.punctuation), but str.translate falls back
+# to a slow per-character path as soon as the text contains any non-ASCII character
+PUNCTUATION_PATTERN = re.compile('[' + re.escape(string.punctuation) + ']')
+
+# Joins a batch of titles into a single buffer. It is neither whitespace nor a cased
+# character, so punctuation removal and lower() behave on each title exactly as they would on its own
+TITLE_SEPARATOR = '\x00'
+
+DEFAULT_BATCH_SIZE = 1024
+
+# Bump whenever a change alters the tokens produced, it invalidates cached token counts
+TOKENIZER_VERSION = 1
+
+
+def _clean_buffer(titles: List[str], separator: str) -> str:
+    # One punctuation pass and one lower call for the whole batch
+    return PUNCTUATION_PATTERN.sub('', separator.join(titles)).lower()
+
+
+def _keep_words(text: str, intern: bool, stopwords: AbstractSet[str]) -> List[str]:
+    # Split on whitespace and keep only alphabetic words that are not stopwords
+    words = filter(str.isalpha, text.split())
+    if stopwords:
+        words = filterfalse(stopwords.__contains__, words)
+    if intern:
+        return list(map(sys.intern, words))
+    return list(words)
+
+
+def tokenize_titles(titles: List[str], intern: bool = False,
+                    stopwords: AbstractSet[str] = frozenset()) -> List[List[str]]:
+    """
+    Process a batch of titles into a list of keyword lists (one list per title).
+
+    Punctuation is removed, the text is lowercased and split on whitespace, and
+    only alphabetic words are kept. Words in stopwords (a set, see stopwords.py)
+    are dropped here so they are never counted. With intern=True every token is
+    interned so repeated words share a single string object.
+    """
+    if not titles:
+        return []
+
+    # A title containing the separator itself would break the batch apart, tokenize those one by one
+    if any(TITLE_SEPARATOR in title for title in titles):
+        return [_keep_words(_clean_buffer([title], TITLE_SEPARATOR), intern, stopwords) for title in titles]
+
+    chunks = _clean_buffer(titles, TITLE_SEPARATOR).split(TITLE_SEPARATOR)
+    return [_keep_words(chunk, intern, stopwords) for chunk in chunks]
+
+
+def tokenize_flat(titles: List[str], intern: bool = False,
+                  stopwords: AbstractSet[str] = frozenset()) -> List[str]:
+    """
+    Tokenize a batch of titles into one flat list of keywords, for callers that only count words.
+
+    Titles are joined with a space, which split() treats like any other whitespace,
+    so the tokens are the same as tokenize_titles would produce, minus the per-title grouping.
+    """
+    return _keep_words(_clean_buffer(titles, ' '), intern, stopwords)
+
+
+def batched(items: Iterable[str], size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[str]]:
+    """
+    Group a stream of titles into lists of at most size titles, so streamed input
+    still goes through the batch tokenizer.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def title_into_keywords(titles_list: List[str]) -> List[List[str]]:
+    """
+    Process a list of titles into a list of keyword lists.
+    """
+    return tokenize_titles(titles_list)
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import statistics
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from generate_dialogue import generate_dialogue
+
+# Grids of (lines, characters); "full" spans 10k to 50M lines and 100 to 1M characters
+PRESETS = {
+    "small": {"lines": [10_000, 100_000], "characters": [100, 1_000]},
+    "full": {"lines": [10_000, 1_000_000, 50_000_000], "characters": [100, 10_000, 1_000_000]},
+}
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_network_stage(args):
+    """
+    Child process: time build_interaction_network and clean_up_network on one CSV.
+    """
+    from interaction_network import build_interaction_network, build_interaction_network_chunked, clean_up_network
+
+    results = [{"stage": "startup", "seconds": 0.0, "peak_rss_mb": peak_rss_mb()}]
+
+    start = time.perf_counter()
+    if args.chunked:
+        network = build_interaction_network_chunked(args.input)
+    else:
+        network = build_interaction_network(args.input)
+    results.append({"stage": "build_chunked" if args.chunked else "build",
+                    "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()})
+
+    start = time.perf_counter()
+    clean_up_network(network, args.output, args.top_n)
+    results.append({"stage": "clean_up", "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()})
+    return results
+
+
+def run_stats_stage(args):
+    """
+    Child process: time compute_network_stats on the filtered network.
+    """
+    from interaction_network import compute_network_stats
+
+    results = [{"stage": "startup", "seconds": 0.0, "peak_rss_mb": peak_rss_mb()}]
+
+    start = time.perf_counter()
+    compute_network_stats(args.input, args.output, workers=args.workers, approx=args.approx, seed=0,
+                          engine=args.engine, metrics=args.metrics)
+    results.append({"stage": "stats", "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()})
+    return results
+
+
+def run_child(stage_args, timeout):
+    """
+    Run one stage in a fresh interpreter, so each stage's peak memory is its own.
+    Returns its results, or None if it failed or timed out.
+    """
+    command = [sys.executable, os.path.abspath(__file__)] + stage_args
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    except subprocess.TimeoutExpired:
+        print(f"  timed out after {timeout} s")
+        return None
+
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    print(f"  failed: {completed.stderr.strip().splitlines()[-1:] or completed.returncode}")
+    return None
+
+
+def run_repeated(stage_args, timeout, repeat):
+    """
+    Run one stage repeat times and combine the results: each step's seconds is the median of
+    its runs, so one noisy run cannot pass for a regression, and its peak memory the largest.
+    Returns None if any run failed or timed out.
+    """
+    repeats = []
+    for _ in range(repeat):
+        results = run_child(stage_args, timeout)
+        if results is None:
+            return None
+        repeats.append(results)
+
+    combined = []
+    for step_runs in zip(*repeats):
+        samples = [result["seconds"] for result in step_runs]
+        combined.append(dict(step_runs[0], seconds=statistics.median(samples), samples=samples,
+                             peak_rss_mb=max(result["peak_rss_mb"] for result in step_runs)))
+    return combined
+
+
+def dataset_path(data_dir, lines, characters, episodes, group_ratio, seed):
+    return os.path.join(data_dir, f"dialog_{lines}l_{characters}c_{episodes}e_{group_ratio}g_{seed}s.csv")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(args):
+    """
+    Generate (or reuse) a synthetic transcript for every grid point, time each stage and
+    return the machine-readable results.
+    """
+    preset = PRESETS[args.preset]
+    line_counts = args.lines or preset["lines"]
+    character_counts = args.characters or preset["characters"]
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="hw12_bench_")
+    os.makedirs(data_dir, exist_ok=True)
+    runs = []
+
+    for lines in line_counts:
+        for characters in character_counts:
+            config = {"lines": lines, "characters": characters, "episodes": args.episodes, "group_ratio": args.group_ratio}
+            print(f"{lines:,} lines, {characters:,} characters")
+
+            csv_file = dataset_path(data_dir, lines, characters, args.episodes, args.group_ratio, args.seed)
+            if not os.path.exists(csv_file):
+                start = time.perf_counter()
+                generate_dialogue(csv_file, lines, characters, args.episodes, args.group_ratio, seed=args.seed)
+                print(f"  generated in {time.perf_counter() - start:.1f} s")
+
+            network_file = csv_file[:-len(".csv")] + "_network.json"
+            stats_file = csv_file[:-len(".csv")] + "_stats.json"
+
+            stage_runs = [["--stage", "network", "-i", csv_file, "-o", network_file, "--top-n", str(args.top_n)]
+                          + (["--chunked"] if args.chunked else []),
+                          ["--stage", "stats", "-i", network_file, "-o", stats_file, "--workers", str(args.workers),
+                           "--engine", args.engine, "--metrics"] + args.metrics
+                          + (["--approx", str(args.approx)] if args.approx else [])]
+
+            for stage_args in stage_runs:
+                results = run_repeated(stage_args, args.timeout, args.repeat)
+                if results is None:
+                    runs.append(dict(config, stage=stage_args[1], seconds=None, peak_rss_mb=None))
+                    break  # Later stages need this one's output
+                for result in results:
+                    runs.append(dict(config, **result))
+                    if result["stage"] != "startup":
+                        print(f"  {result['stage']:<14} {result['seconds']:>9.3f} s  {result['peak_rss_mb']:>9.1f} MB peak")
+
+            if not args.data_dir:
+                for path in (csv_file, network_file, stats_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    if not args.data_dir:
+        os.rmdir(data_dir)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": {"top_n": args.top_n, "chunked": args.chunked, "engine": args.engine, "metrics": args.metrics,
+                         "approx": args.approx, "workers": args.workers, "seed": args.seed, "repeat": args.repeat},
+        },
+        "runs": runs,
+    }
+
+
+def compare_to_baseline(results, baseline_file, tolerance, min_delta=0.05):
+    """
+    Print every stage that got slower than the baseline results by more than tolerance and
+    by more than min_delta seconds, so millisecond stages are not flagged on timer noise.
+    """
+    with open(baseline_file, 'r', encoding='utf-8') as infile:
+        baseline = json.load(infile)
+
+    if baseline["meta"]["settings"] != results["meta"]["settings"]:
+        print(f"Note: {baseline_file} was run with different settings, {baseline['meta']['settings']}")
+
+    def key(run):
+        return run["lines"], run["characters"], run["episodes"], run["group_ratio"], run["stage"]
+
+    baseline_seconds = {key(run): run["seconds"] for run in baseline["runs"] if run["seconds"]}
+    regressions = 0
+    for run in results["runs"]:
+        before = baseline_seconds.get(key(run))
+        if before and run["seconds"] and run["seconds"] > before * (1 + tolerance) and run["seconds"] - before > min_delta:
+            regressions += 1
+            print(f"Regression: {run['stage']} at {run['lines']:,} lines, {run['characters']:,} characters: "
+                  f"{before:.3f} s -> {run['seconds']:.3f} s ({run['seconds'] / before:.2f}x)")
+    print(f"{regressions} regressions against {baseline_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the interaction network pipeline (build, clean up, stats) on synthetic dialogue.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Output JSON file of timings and peak memory per stage.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small", help="Grid of line and character counts to run.")
+    parser.add_argument("-n", "--lines", type=int, nargs="+", help="Line counts to run (overrides the preset).")
+    parser.add_argument("-c", "--characters", type=int, nargs="+", help="Character counts to run (overrides the preset).")
+    parser.add_argument("-e", "--episodes", type=int, default=200, help="Episodes per synthetic transcript.")
+    parser.add_argument("-g", "--group-ratio", type=float, default=0.05, help="Fraction of lines spoken by group names.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generator.")
+    parser.add_argument("--data-dir", help="Keep generated transcripts here and reuse them on later runs (default: a temporary directory, deleted per grid point).")
+    parser.add_argument("--top-n", type=int, default=101, help="Speakers kept by clean_up_network.")
+    parser.add_argument("--chunked", action="store_true", help="Benchmark the chunked numpy/pandas builder instead of the row loop.")
+    parser.add_argument("--engine", choices=["networkx", "csr"], default="networkx", help="compute_network_stats engine.")
+    parser.add_argument("--metrics", nargs="+", default=["degree", "weighted_degree", "closeness", "betweenness"], help="compute_network_stats metrics (closeness and betweenness dominate on large graphs).")
+    parser.add_argument("--approx", type=int, help="Pivot sample size for closeness and betweenness.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="compute_network_stats worker processes.")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before a stage is abandoned.")
+    parser.add_argument("--baseline", help="Earlier results file to compare against, reporting slower stages.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Slowdown ratio above which a stage counts as a regression.")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Seconds a stage must also slow down by to count as a regression.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs of each stage; the median time is reported and compared.")
+
+    # Internal: run one stage in this process (used by the harness's child processes)
+    parser.add_argument("--stage", choices=["network", "stats"], help=argparse.SUPPRESS)
+    parser.add_argument("-i", "--input", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.repeat < 1 or args.min_delta < 0:
+        parser.error("--repeat must be at least 1 and --min-delta cannot be negative")
+
+    if args.stage:
+        results = run_network_stage(args) if args.stage == "network" else run_stats_stage(args)
+        print(RESULT_MARKER + json.dumps(results))
+        return
+
+    results = run_benchmarks(args)
+    with open(args.output, 'w', encoding='utf-8') as outfile:
+        json.dump(results, outfile, indent=4)
+    print(f"Benchmark results saved to {args.output}")
+
+    if args.baseline:
+        compare_to_baseline(results, args.baseline, args.tolerance, args.min_delta)
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 benchmark_network.py --preset small -o benchmark_results.json --baseline previous_results.json
+    # Use case: python3 benchmark_network.py --preset full --data-dir bench_data --engine csr --approx 64 --timeout 7200
@@ -1,99 +1,51 @@
-import csv
-import json
 import argparse
-from collections import defaultdict
+from interaction_network import (build, build_bounded, write_network, clean_up_network, append_interaction_network,
+                                 build_snapshots)
 
-def build_interaction_network(input_file):
 
-    interaction_network = defaultdict(lambda: defaultdict(int)) # {"speaker": {"listener": interactions, ...}, ... }
-    speaker = None
-    prev_episode = None
-
-    # Words to skip when determining listener
-    skip_words = {"others", "ponies", "and", "all"}
-
-    with open(input_file, 'r', encoding='utf-8') as csvfile:
-        dialogue = csv.reader(csvfile)
-
-        for line in dialogue:
-
-            # REDUNDANT, we check listener validity before making them a speaker
-            # # Skip if current speaker name indicates group or not singular
-            # invalid_speaker = False
-
-            # if speaker:
-            #     for word in speaker.split(" "):
-            #         if word in skip_words: # Is the character name valid
-            #             invalid_speaker = True
-            #             break # out of this inner loop 
-
-            # if invalid_speaker: # Go to next line and try again
-            #     speaker = None
-            #     continue # Current speaker wasn't a valid character so go to next line
-
-            episode, listener = line[0].lower(), line[2].lower() # Info from line
-
-            if prev_episode and prev_episode != episode: # If this line and the next line aren't the same episode
-                speaker = None
-                prev_episode = episode # Only change prev episode if it's the first line or if the current episode is different than the last one
-                continue # Skip: last line character of episode i is not talking to first line character in episode i + 1
-
-            if speaker == listener:
-                continue # but don't change speaker because it must be valid if this char was assigned to speaker from previous loop and maybe the next line is another character
-                # ex:
-                # A: "bla"
-                # A: "bla"
-                # B: "bla" A->B is an speaker-listener interaction
-
-            # Skip if current row has a character name indicating group or not singular listener/speaker
-            invalid_listener = False
-
-            for word in listener.split(" "):
-                if word in skip_words: # Is the character name valid
-                    invalid_listener = True
-                    break # out of this inner loop 
-
-            if invalid_listener: # Same principle as with speaker.  Also discount if character has 2 subsequent dialogue lines 
-                speaker = None
-                continue # Current speaker wasn't speaking to a valid single character, go to next line iteration
-
-            # If we get here and have a current speaker, then the interaction is valid
-            if speaker:
-                interaction_network[speaker][listener] += 1 # speaker speaks to character (listener)
-            speaker = listener # Might assign current speaker as invalid but will be pruned at start of next iteration
-
-    return interaction_network
-
-def clean_up_network(interactions_dict, output_file):
-    # speakers and all their speaks
-    speaks_counts = {}
-
-    # calculate total lines spoken by given speaker
-    for speaker, listener_dict in interactions_dict.items():
-        times_spoken = sum(listener_dict.values())  # add up all interactions for this speaker
-        speaks_counts[speaker] = times_spoken
-
-    # Sort via total lines spoken most to least, lambda [1] cuz value is an int to sort by
-    top_speakers = [speaker for speaker, _ in sorted(speaks_counts.items(), key=lambda x: x[1], reverse=True)[:101]]
-
-    filtered_interactions_dict = {} # new dict with only those characters
-
-    for speaker in top_speakers:
-        filtered_interactions_dict[speaker] = interactions_dict[speaker]
-
-    # Save the filtered interaction network to a JSON file
-    with open(output_file, 'w', encoding='utf-8') as network_json:
-        json.dump(filtered_interactions_dict, network_json, indent=4)
-
-    print(f"Filtered interaction network saved to {output_file}")
-
-
-if __name__ == "__main__":
+def main():
     parser = argparse.ArgumentParser(description="Build an interaction network of My Little Pony Character from their dialogue CSV file.")
     parser.add_argument("-i", "--input", required=True, help="Path to the input dialogue CSV file.")
-    parser.add_argument("-o", "--output", required=True, help="Path to the output JSON Interaction Network.")
+    parser.add_argument("-o", "--output", required=True, help="Path to the output JSON Interaction Network (or a compact .npz edge list).")
+    parser.add_argument("-k", "--top-k", type=int, default=101, help="Number of most talkative speakers to keep in the network.")
+    parser.add_argument("--chunked", action="store_true", help="Read the CSV in columnar chunks with numpy/pandas, for very large transcripts.")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows per chunk with --chunked.")
+    parser.add_argument("--bounded", type=int, metavar="CAPACITY", help="Bounded memory: track only this many speakers with a Space-Saving sketch, reporting an approximate top-k with error bounds.")
+    parser.add_argument("--compact", action="store_true", help="Write the JSON network without indentation (a .jsonl output is always one compact line per speaker).")
+    parser.add_argument("--snapshots", action="store_true", help="Write one network per episode (or per --window episodes) to the output, as JSON Lines, instead of a single network.")
+    parser.add_argument("--window", type=int, default=1, help="With --snapshots, number of consecutive episodes in each sliding window.")
+    parser.add_argument("--state", help="Append mode: keep the raw counts and parser position in this SQLite database and only read rows added to the CSV since the last run.")
 
     args = parser.parse_args()
 
-    unfiltered_network = build_interaction_network(args.input)
-    clean_up_network(unfiltered_network, args.output)
+    if args.bounded is not None and args.bounded < 1:
+        parser.error("--bounded capacity must be at least 1")
+    if args.bounded is not None and (args.state or args.chunked or args.snapshots):
+        parser.error("--bounded builds in a single streaming pass, it cannot be combined with --state, --chunked or --snapshots")
+
+    if args.snapshots:
+        build_snapshots(args.input, args.output, args.window, args.top_k)
+    elif args.bounded is not None:
+        network, bounds, exact = build_bounded(args.input, args.top_k, args.bounded)
+        max_error = max((error for _, error in bounds.values()), default=0)
+        if exact:
+            print(f"Top {args.top_k} speakers are exact (largest count error {max_error})")
+        else:
+            print(f"Top {args.top_k} speakers are approximate: counts may be overestimated by up to {max_error}, "
+                  f"raise the capacity above {args.bounded} for a tighter result")
+        write_network(network, args.output, args.compact, bounds)
+    elif args.state:
+        if args.chunked:
+            parser.error("--state reads only the appended rows, it cannot be combined with --chunked")
+        append_interaction_network(args.input, args.output, args.state, args.top_k, args.compact)
+    else:
+        unfiltered_network = build(args.input, args.chunked, args.chunk_size)
+        clean_up_network(unfiltered_network, args.output, args.top_k, args.compact)
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 build_interaction_network.py -i clean_dialog.csv -o interactions.json
+    # Use case: python3 build_interaction_network.py -i clean_dialog.csv -o interactions.json --state interactions_state.db
+    # Use case: python3 build_interaction_network.py -i clean_dialog.csv -o interactions.jsonl --bounded 10000
+    # Use case: python3 build_interaction_network.py -i clean_dialog.csv -o snapshots.jsonl --snapshots --window 5
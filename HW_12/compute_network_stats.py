@@ -1,57 +1,52 @@
-import json
 import argparse
-import networkx as nx
+from interaction_network import compute_network_stats, compute_snapshot_stats, METRICS
+from interaction_network.stats import MIN_APPROX
+from interaction_network.snapshots import is_dialogue_csv
+from interaction_network.centrality_cache import DEFAULT_CACHE_SIZE_MB, DEFAULT_MAX_AGE_DAYS
 
-def compute_network_stats(input_file, output_file):
-    # Load the json network
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        interaction_network = json.load(infile)
 
-    # Instantiate a directed graph using NetworkX
-    InteractionGraph = nx.DiGraph()
-
-    # Add edges with weights
-    for speaker, listeners in interaction_network.items():
-        for listener, intrxn_count in listeners.items():
-            InteractionGraph.add_edge(speaker, listener, weight=intrxn_count)
-
-    # degree centrality (unweighted) via library function
-    degree_centrality = nx.degree_centrality(InteractionGraph) # what does it return??
-    top_degree = sorted(degree_centrality, key=degree_centrality.get, reverse=True)[:3]
-    # foo = nx.degree_centrality(InteractionGraph, we) # what does it return??
-    foo = InteractionGraph.degree(weight='weight')
-    top_degree2 = sorted(foo, key=lambda x: x[1], reverse=True)[:3]
-    print(top_degree2)
-    # weighted degree centrality (sum of edge weights)
-    weighted_degree_centrality = {
-        character: sum(data["weight"] for _, _, data in InteractionGraph.edges(character, data=True))
-        for character in InteractionGraph.nodes
-    }
-    top_weighted_degree = sorted(weighted_degree_centrality, key=weighted_degree_centrality.get, reverse=True)[:3] # sort by highest value and take top 3
-
-    closeness_centrality = nx.closeness_centrality(InteractionGraph)
-    top_closeness = sorted(closeness_centrality, key=closeness_centrality.get, reverse=True)[:3]
-
-    betweenness_centrality = nx.betweenness_centrality(InteractionGraph, weight='weight')
-    top_betweenness = sorted(betweenness_centrality, key=betweenness_centrality.get, reverse=True)[:3]
-
-    # Save the results to a JSON file
-    stats = {
-        "degree": top_degree,
-        "weighted_degree": top_weighted_degree,
-        "closeness": top_closeness,
-        "betweenness": top_betweenness,
-    }
-
-    with open(output_file, 'w', encoding='utf-8') as outfile:
-        json.dump(stats, outfile, indent=4)
-
-    print(f"Network statistics saved to {output_file}")
-
-if __name__ == "__main__":
+def main():
     parser = argparse.ArgumentParser(description="Compute network statistics from an interaction network JSON.")
-    parser.add_argument("-i", "--input", required=True, help="Path to the input interaction network JSON file.")
+    parser.add_argument("-i", "--input", required=True, help="Path to the input interaction network JSON file (or JSON Lines, or a compact .npz edge list).")
     parser.add_argument("-o", "--output", required=True, help="Path to the output statistics JSON file.")
+    parser.add_argument("-k", "--top-k", type=int, default=3, help="Number of top characters to report for each metric.")
+
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes for closeness and betweenness centrality.")
+    parser.add_argument("--approx", type=int, help="Estimate closeness and betweenness from this many sampled pivot nodes (at least 2) instead of all of them.")
+    parser.add_argument("--seed", type=int, help="Random seed for the --approx pivot sample, for reproducible results.")
+    parser.add_argument("--report-error", action="store_true", help="With --approx, also compute the exact values and print the approximation error.")
+
+    parser.add_argument("--engine", choices=["networkx", "csr"], help="Graph backend: NetworkX (the default), or NumPy CSR arrays for degree, weighted degree and closeness (NetworkX is then only needed for betweenness).")
+    parser.add_argument("--cache-dir", help="Directory caching full closeness and betweenness vectors by graph and parameters, so reruns (e.g. with another --top-k) skip recomputing them.")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_CACHE_SIZE_MB, help="Size cap of --cache-dir, least recently used entries are evicted first.")
+    parser.add_argument("--cache-max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS, help="Evict --cache-dir entries unused for longer than this.")
+    parser.add_argument("--snapshots", action="store_true", help="Input is a snapshots .jsonl from build_interaction_network.py --snapshots, or a dialogue CSV to cut into snapshots on the fly: write one line of rankings per snapshot (--workers then spreads snapshots over processes).")
+    parser.add_argument("--window", type=int, help="With --snapshots and a dialogue CSV input, number of consecutive episodes in each sliding window (default 1).")
+    parser.add_argument("--top-n", type=int, help="With --snapshots and a dialogue CSV input, number of most talkative speakers kept in each snapshot (default 101).")
+    parser.add_argument("--metrics", nargs="+", choices=METRICS, default=METRICS, help="Metrics to compute (all by default).")
 
     args = parser.parse_args()
-    compute_network_stats(args.input, args.output)
+    if args.approx is not None and args.approx < MIN_APPROX:
+        parser.error(f"--approx must sample at least {MIN_APPROX} pivot nodes")
+    if args.snapshots:
+        # Snapshots are ranked incrementally with their own degree tracker and no centrality cache
+        if args.engine or args.cache_dir or args.report_error:
+            parser.error("--snapshots cannot be combined with --engine, --cache-dir or --report-error")
+        if (args.window is not None or args.top_n is not None) and not is_dialogue_csv(args.input):
+            parser.error("--window and --top-n only apply to a dialogue CSV input, a snapshots file is already cut into windows")
+        if (args.window is not None and args.window < 1) or (args.top_n is not None and args.top_n < 1):
+            parser.error("--window and --top-n must be at least 1")
+        compute_snapshot_stats(args.input, args.output, args.top_k, args.workers, args.metrics, args.approx, args.seed,
+                               args.window or 1, args.top_n or 101)
+    else:
+        compute_network_stats(args.input, args.output, args.top_k, args.workers, args.approx, args.seed, args.report_error,
+                              args.engine or "networkx", args.metrics, args.cache_dir, args.cache_size_mb, args.cache_max_age_days)
+
+
+if __name__ == "__main__":
+    main()
+    # Use case: python3 compute_network_stats.py -i interactions.json -o stats.json --workers 4 --approx 200 --seed 0
+    # Use case: python3 compute_network_stats.py -i interactions.npz -o stats.json --engine csr --metrics degree weighted_degree closeness
+    # Use case: python3 compute_network_stats.py -i interactions.json -o stats.json --cache-dir .centrality_cache
+    # Use case: python3 compute_network_stats.py -i snapshots.jsonl -o snapshot_stats.jsonl --snapshots --workers 4
+    # Use case: python3 compute_network_stats.py -i clean_dialog.csv -o snapshot_stats.jsonl --snapshots --window 5
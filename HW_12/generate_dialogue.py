@@ -0,0 +1,58 @@
+import csv
+import random
+import argparse
+from itertools import accumulate
+
+# Group speaker names, each containing one of the words build_interaction_network skips
+GROUP_NAMES = ["All", "Ponies", "Other ponies", "Crowd and guards", "Mane six and Spike"]
+BATCH_SIZE = 100_000
+
+
+def generate_dialogue(output_file, lines=10_000, characters=100, episodes=10, group_ratio=0.05, skew=1.0, seed=0):
+    """
+    Write a synthetic transcript CSV with the same columns as the show's clean_dialog.csv.
+
+    Args:
+        output_file (str): Path of the CSV to write.
+        lines (int): Number of dialogue lines.
+        characters (int): Number of distinct single speakers, "Character 0" to "Character {characters - 1}".
+        episodes (int): Number of episodes the lines are split evenly over.
+        group_ratio (float): Fraction of lines spoken by a group name (which the network build skips).
+        skew (float): Zipf exponent of how often each character speaks; 0 makes everyone equally talkative.
+        seed (int): Random seed, so a configuration always produces the same file.
+    """
+    rng = random.Random(seed)
+    names = [f"Character {i}" for i in range(characters)]
+    cum_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(characters)))
+    lines_per_episode = max(1, -(-lines // episodes))  # Ceiling division
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["title", "writer", "pony", "dialog"])
+
+        for start in range(0, lines, BATCH_SIZE):
+            batch = min(BATCH_SIZE, lines - start)
+            speakers = rng.choices(names, cum_weights=cum_weights, k=batch)
+            rows = []
+            for offset, speaker in enumerate(speakers):
+                if rng.random() < group_ratio:
+                    speaker = rng.choice(GROUP_NAMES)
+                episode = (start + offset) // lines_per_episode
+                rows.append([f"Episode {episode}", "Writer", speaker, "Line of dialogue."])
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic dialogue CSV for benchmarking the interaction network pipeline.")
+    parser.add_argument("-o", "--output", required=True, help="Path to the output dialogue CSV file.")
+    parser.add_argument("-n", "--lines", type=int, default=10_000, help="Number of dialogue lines.")
+    parser.add_argument("-c", "--characters", type=int, default=100, help="Number of distinct characters.")
+    parser.add_argument("-e", "--episodes", type=int, default=10, help="Number of episodes.")
+    parser.add_argument("-g", "--group-ratio", type=float, default=0.05, help="Fraction of lines spoken by a group name.")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of character talkativeness (0 = uniform).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    args = parser.parse_args()
+    generate_dialogue(args.output, args.lines, args.characters, args.episodes, args.group_ratio, args.skew, args.seed)
+    print(f"Synthetic dialogue saved to {args.output}")
+    # Use case: python3 generate_dialogue.py -o synthetic_dialog.csv -n 1000000 -c 10000 -e 200
@@ -0,0 +1,21 @@
+"""
+Character interaction networks from show transcripts: build the speaker -> listener
+network from dialogue rows, prune it to the most talkative characters, and rank them by
+degree, weighted degree, closeness and betweenness centrality.
+
+    from interaction_network import build, prune, compute_stats
+    stats = compute_stats(prune(build("clean_dialog.csv"), top_n=101), top_k=3)
+
+The build_interaction_network.py and compute_network_stats.py scripts are thin command
+line wrappers around this package.
+"""
+from .build import (build, build_interaction_network, build_interaction_network_chunked, build_bounded,
+                    fold_dialogue, iter_dialogue_rows, iter_episode_networks, SKIP_WORDS)
+from .prune import prune, top_speakers, write_network, clean_up_network
+from .stats import compute_stats, compute_network_stats, load_interaction_graph, networkx_graph, METRICS
+from .network_state import (NetworkState, open_network_state, fold_into_state, refresh_top_speakers,
+                            append_interaction_network)
+from .snapshots import iter_window_networks, iter_window_changes, SlidingWindow, DegreeTracker, build_snapshots, iter_snapshots, compute_snapshot_stats
+from .edge_list import EdgeList, load_edge_list, save_edge_list, load_network_json
+from .csr_graph import CSRGraph
+from .heavy_hitters import SpaceSaving
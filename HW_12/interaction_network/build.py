@@ -0,0 +1,217 @@
+import csv
+from collections import defaultdict
+from itertools import groupby
+from .heavy_hitters import SpaceSaving
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # Only the chunked columnar builder needs them
+    np = None
+    pd = None
+
+# Words in a character name that indicate a group rather than a single speaker/listener
+SKIP_WORDS = {"others", "ponies", "and", "all"}
+
+
+def iter_dialogue_rows(source):
+    """
+    Yield the CSV rows of source, either a path to a dialogue CSV file or rows already in
+    memory (any iterable of [episode, writer, character, line] lists).
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as csvfile:
+            yield from csv.reader(csvfile)
+    else:
+        yield from source
+
+
+def build(source, chunked=False, chunk_size=1_000_000):
+    """
+    Build the full {speaker: {listener: interactions}} network from a dialogue CSV path or
+    in-memory rows. chunked uses the columnar numpy/pandas builder, which needs a file.
+    """
+    if chunked:
+        return build_interaction_network_chunked(source, chunk_size)
+    return build_interaction_network(source)
+
+
+def build_interaction_network(input_file):
+
+    interaction_network = defaultdict(lambda: defaultdict(int)) # {"speaker": {"listener": interactions, ...}, ... }
+
+    # input_file may also be in-memory rows, see iter_dialogue_rows
+    fold_dialogue(iter_dialogue_rows(input_file), interaction_network)
+
+    return interaction_network
+
+def fold_dialogue(dialogue, interaction_network, speaker=None):
+    """
+    Count the speaker -> listener interactions of the given CSV rows into interaction_network.
+
+    speaker is the parser state carried over from earlier rows (None at the start of a
+    transcript). Returns the state after the last row, so a later batch of rows can
+    continue exactly where this one stopped.
+    """
+    prev_episode = None
+
+    # Words to skip when determining listener
+    skip_words = SKIP_WORDS
+
+    for line in dialogue:
+
+        # REDUNDANT, we check listener validity before making them a speaker
+        # # Skip if current speaker name indicates group or not singular
+        # invalid_speaker = False
+
+        # if speaker:
+        #     for word in speaker.split(" "):
+        #         if word in skip_words: # Is the character name valid
+        #             invalid_speaker = True
+        #             break # out of this inner loop 
+
+        # if invalid_speaker: # Go to next line and try again
+        #     speaker = None
+        #     continue # Current speaker wasn't a valid character so go to next line
+
+        episode, listener = line[0].lower(), line[2].lower() # Info from line
+
+        if prev_episode and prev_episode != episode: # If this line and the next line aren't the same episode
+            speaker = None
+            prev_episode = episode # Only change prev episode if it's the first line or if the current episode is different than the last one
+            continue # Skip: last line character of episode i is not talking to first line character in episode i + 1
+
+        if speaker == listener:
+            continue # but don't change speaker because it must be valid if this char was assigned to speaker from previous loop and maybe the next line is another character
+            # ex:
+            # A: "bla"
+            # A: "bla"
+            # B: "bla" A->B is an speaker-listener interaction
+
+        # Skip if current row has a character name indicating group or not singular listener/speaker
+        invalid_listener = False
+
+        for word in listener.split(" "):
+            if word in skip_words: # Is the character name valid
+                invalid_listener = True
+                break # out of this inner loop 
+
+        if invalid_listener: # Same principle as with speaker.  Also discount if character has 2 subsequent dialogue lines 
+            speaker = None
+            continue # Current speaker wasn't speaking to a valid single character, go to next line iteration
+
+        # If we get here and have a current speaker, then the interaction is valid
+        if speaker:
+            interaction_network[speaker][listener] += 1 # speaker speaks to character (listener)
+        speaker = listener # Might assign current speaker as invalid but will be pruned at start of next iteration
+
+    return speaker
+
+def is_group_name(name):
+    # Same test as the row-by-row loop: any word of the name is a skip word
+    return any(word in SKIP_WORDS for word in name.split(" "))
+
+
+def build_interaction_network_chunked(input_file, chunk_size=1_000_000):
+    """
+    Columnar equivalent of build_interaction_network for very large transcripts.
+
+    The character column is read in blocks of chunk_size rows, names are factorized to
+    integer IDs and classified as group names once per unique name, and speaker -> listener
+    pairs come from comparing each row with the previous one as whole arrays.
+
+    The row-by-row loop reduces to: row i - 1 speaks to row i when both names are valid
+    (not group names), they differ, and the speaker name is non-empty. A skipped repeat keeps
+    the same speaker, and an invalid row clears it, so the previous row alone decides. Its
+    episode check never fires (prev_episode is never assigned), so episodes are not
+    separated here either, which keeps the edge counts identical.
+    """
+    if pd is None or np is None:
+        raise ImportError("The chunked builder requires numpy and pandas (pip install numpy pandas)")
+
+    interaction_network = defaultdict(lambda: defaultdict(int))
+    name_ids = {}  # lowercased name -> ID
+    names = []     # ID -> lowercased name
+    can_listen = np.zeros(0, dtype=bool)  # ID -> not a group name
+    can_speak = np.zeros(0, dtype=bool)   # ID -> valid and non-empty (a truthy speaker)
+    prev_id = -1   # ID of the last row of the previous chunk, -1 if it cannot speak
+
+    chunks = pd.read_csv(input_file, header=None, usecols=[2], dtype=str, keep_default_na=False,
+                         chunksize=chunk_size, encoding='utf-8')
+
+    for chunk in chunks:
+        codes, uniques = pd.factorize(chunk[2].to_numpy())
+
+        # Lowercase, look up and classify each distinct name of the chunk once
+        num_known = len(names)
+        chunk_ids = np.empty(len(uniques), dtype=np.int64)
+        for code, raw_name in enumerate(uniques):
+            name = raw_name.lower()
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(names)
+                names.append(name)
+            chunk_ids[code] = name_id
+
+        new_names = names[num_known:]
+        if new_names:
+            new_valid = np.array([not is_group_name(name) for name in new_names], dtype=bool)
+            can_listen = np.concatenate([can_listen, new_valid])
+            can_speak = np.concatenate([can_speak, new_valid & np.array([name != "" for name in new_names], dtype=bool)])
+
+        ids = chunk_ids[codes]
+        listener_ok = can_listen[ids]
+
+        # Each row's speaker is the previous row, carried over from the last chunk for the first row
+        speakers = np.concatenate([[prev_id], ids[:-1]])
+        speaker_ok = np.concatenate([[prev_id >= 0], can_speak[ids[:-1]]])
+        is_edge = listener_ok & speaker_ok & (speakers != ids)
+
+        sources, targets = speakers[is_edge], ids[is_edge]
+        prev_id = ids[-1] if can_speak[ids[-1]] else -1
+
+        # Count pairs, then insert them in order of first appearance so the dict order is the loop's order
+        pair_keys = sources * len(names) + targets
+        unique_keys, first_seen, counts = np.unique(pair_keys, return_index=True, return_counts=True)
+        for position in np.argsort(first_seen, kind='stable'):
+            speaker, listener = divmod(int(unique_keys[position]), len(names))
+            interaction_network[names[speaker]][names[listener]] += int(counts[position])
+
+    return interaction_network
+
+
+def build_bounded(source, top_n=101, capacity=10_000):
+    """
+    Bounded-memory build and prune in one pass, for transcripts with millions of speakers.
+
+    Speakers are tracked with a Space-Saving sketch of `capacity` entries instead of the full
+    network, so only the heavy hitters and their listeners are ever held. The top_n are then
+    approximate: each speaker's line count is an overestimate by at most its error, and their
+    listener counts only cover the rows seen while they were tracked (all of them when the
+    error is 0). With capacity at least the number of speakers the result is exact.
+
+    Returns the top_n network, {speaker: (count, error)} bounds, and whether the top_n set is
+    guaranteed exact.
+    """
+    sketch = SpaceSaving(capacity)
+    fold_dialogue(iter_dialogue_rows(source), sketch)
+
+    top = sketch.top(top_n)
+    top_speakers = [speaker for speaker, _, _ in top]
+    bounds = {speaker: (count, error) for speaker, count, error in top}
+    return sketch.network(top_speakers), bounds, sketch.is_exact_top(top_n)
+
+
+def iter_episode_networks(source):
+    """
+    Yield (episode, network) for each run of consecutive rows of the same episode.
+
+    Each episode is folded on its own, starting without a speaker, so the last speaker of
+    one episode never counts as talking to the first of the next (what the prev_episode
+    check in fold_dialogue intends). Episodes without any interaction are skipped.
+    """
+    for episode, rows in groupby(iter_dialogue_rows(source), key=lambda line: line[0].lower()):
+        episode_network = defaultdict(lambda: defaultdict(int))
+        fold_dialogue(rows, episode_network)
+        if episode_network:
+            yield episode, episode_network
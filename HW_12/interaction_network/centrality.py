@@ -0,0 +1,156 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+
+# Graphs handed to each worker process once, by the pool initializer
+_worker_graph = None
+_worker_reversed = None
+
+
+def _init_worker(graph):
+    global _worker_graph, _worker_reversed
+    _worker_graph = graph
+    _worker_reversed = graph.reverse(copy=True)
+
+
+def _split(nodes, parts):
+    # Round-robin so every chunk gets a mix of hub and leaf nodes
+    return [nodes[i::parts] for i in range(parts) if nodes[i::parts]]
+
+
+def _pivots(graph, k, seed):
+    # Same sampling as nx.betweenness_centrality(k=..., seed=...), so serial and parallel runs agree
+    return random.Random(seed).sample(list(graph.nodes()), k)
+
+
+def _partial_betweenness(sources, weight):
+    # Unnormalized betweenness contributed by shortest paths starting at these sources
+    return nx.betweenness_centrality_subset(_worker_graph, sources=sources, targets=list(_worker_graph),
+                                            normalized=False, weight=weight)
+
+
+def _partial_betweenness_weighted(sources):
+    return _partial_betweenness(sources, 'weight')
+
+
+def _partial_betweenness_unweighted(sources):
+    return _partial_betweenness(sources, None)
+
+
+def _closeness_of(nodes):
+    # Exact closeness, as nx.closeness_centrality computes it: distances *to* each node,
+    # i.e. BFS on the reversed graph, with the Wasserman-Faust correction
+    n = len(_worker_graph)
+    result = {}
+    for node in nodes:
+        distances = nx.single_source_shortest_path_length(_worker_reversed, node)
+        total = sum(distances.values())
+        reached = len(distances) - 1
+        result[node] = reached / total * (reached / (n - 1)) if total > 0 and n > 1 else 0.0
+    return result
+
+
+def _pivot_distances(pivots):
+    # For every node, how many pivots reach it and the summed distance from those pivots
+    reached, total = {}, {}
+    for pivot in pivots:
+        for node, distance in nx.single_source_shortest_path_length(_worker_graph, pivot).items():
+            if node != pivot:
+                reached[node] = reached.get(node, 0) + 1
+                total[node] = total.get(node, 0) + distance
+    return reached, total
+
+
+def _run(graph, workers, func, chunks):
+    # Serial runs reuse the same worker functions, without a pool
+    if workers <= 1:
+        _init_worker(graph)
+        return [func(chunk) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as pool:
+        return list(pool.map(func, chunks))
+
+
+def compute_betweenness(graph, workers=1, k=None, seed=None, weight='weight'):
+    """
+    Normalized betweenness centrality, exact or estimated from k sampled source pivots.
+
+    With workers > 1 the sources are split across a process pool; each worker returns
+    the unnormalized betweenness of the paths starting at its sources, and the partial
+    sums are added up and rescaled the same way nx.betweenness_centrality does.
+    """
+    if workers <= 1:
+        return nx.betweenness_centrality(graph, k=k, weight=weight, seed=seed)
+
+    sources = list(graph) if k is None else _pivots(graph, k, seed)
+    partials = _run(graph, workers, _partial_betweenness_weighted if weight else _partial_betweenness_unweighted,
+                    _split(sources, workers * 4))
+
+    betweenness = dict.fromkeys(graph, 0.0)
+    for partial in partials:
+        for node, value in partial.items():
+            betweenness[node] += value
+
+    # Divide by the number of (source, target) pairs each node could lie between
+    N = len(graph) - 1
+    if N < 2:
+        return betweenness
+    if k is None:
+        for node in betweenness:
+            betweenness[node] /= N * (N - 1)
+    else:
+        # A sampled source cannot lie on its own paths, so it had one pivot fewer
+        sampled = set(sources)
+        for node in betweenness:
+            pivots = k - 1 if node in sampled else k
+            betweenness[node] = betweenness[node] / (pivots * (N - 1)) if pivots else float('nan')
+    return betweenness
+
+
+def compute_closeness(graph, workers=1, k=None, seed=None):
+    """
+    Closeness centrality (unweighted, incoming distances, Wasserman-Faust corrected),
+    exact or estimated from k sampled pivots.
+
+    The estimate runs one BFS per pivot instead of one per node: for each node, the
+    fraction of pivots that reach it and their mean distance to it stand in for the
+    reachable fraction and mean distance over the whole graph.
+    """
+    if workers <= 1 and k is None:
+        return nx.closeness_centrality(graph)
+
+    nodes = list(graph)
+    if k is None:
+        closeness = {}
+        for partial in _run(graph, workers, _closeness_of, _split(nodes, max(workers, 1) * 4)):
+            closeness.update(partial)
+        return {node: closeness[node] for node in nodes}  # Back in graph order for stable tie-breaking
+
+    pivots = _pivots(graph, k, seed)
+    reached, total = {}, {}
+    for partial_reached, partial_total in _run(graph, workers, _pivot_distances, _split(pivots, max(workers, 1) * 4)):
+        for node, count in partial_reached.items():
+            reached[node] = reached.get(node, 0) + count
+            total[node] = total.get(node, 0) + partial_total[node]
+
+    sampled = set(pivots)
+    closeness = {}
+    for node in nodes:
+        pivot_count = k - 1 if node in sampled else k
+        hits, distance = reached.get(node, 0), total.get(node, 0)
+        closeness[node] = hits / distance * (hits / pivot_count) if distance > 0 and pivot_count > 0 else 0.0
+    return closeness
+
+
+def centrality_error(exact, estimate, top_k=3):
+    """
+    Compare estimated centralities against exact ones: absolute errors and how many of
+    the exact top k nodes the estimate also ranks in its top k.
+    """
+    errors = [abs(exact[node] - estimate[node]) for node in exact]
+    exact_top = set(sorted(exact, key=exact.get, reverse=True)[:top_k])
+    estimate_top = set(sorted(estimate, key=estimate.get, reverse=True)[:top_k])
+    return {
+        "max_abs_error": max(errors, default=0.0),
+        "mean_abs_error": sum(errors) / len(errors) if errors else 0.0,
+        "top_k_overlap": len(exact_top & estimate_top) / top_k if top_k else 1.0,
+    }
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CACHE_SUFFIX = '.centrality'
+CACHE_VERSION = 1
+DEFAULT_CACHE_SIZE_MB = 256
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def graph_fingerprint(nodes: Iterable[str], edges: Iterable[Tuple[str, str, int]]) -> str:
+    """
+    Canonical hash of a weighted directed graph: its sorted node names and sorted
+    (speaker, listener, weight) edges, so the same network loaded from JSON, JSON Lines
+    or .npz, in any order, gets the same fingerprint.
+    """
+    digest = hashlib.sha256()
+    for node in sorted(nodes):
+        digest.update(json.dumps(node).encode('utf-8') + b"\n")
+    digest.update(b"--\n")
+    for edge in sorted(edges):
+        digest.update(json.dumps(edge).encode('utf-8') + b"\n")
+    return digest.hexdigest()
+
+
+def cache_key(fingerprint: str, metric: str, params: Dict[str, Any]) -> str:
+    """
+    Key a centrality vector by the graph fingerprint, the metric and every parameter that
+    changes its values (edge weights, pivot count and seed).
+    """
+    description = {"version": CACHE_VERSION, "graph": fingerprint, "metric": metric, "params": params}
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_cached_centrality(cache_dir: str, key: str, nodes: List[str]) -> Optional[Dict[str, float]]:
+    """
+    Return the cached {node: value} vector for key, in the given node order so rankings break
+    ties as a fresh computation would, or None on a miss. A hit refreshes the entry's
+    modification time, which both the LRU and the age eviction go by.
+    """
+    path = os.path.join(cache_dir, key + CACHE_SUFFIX)
+    try:
+        with open(path, 'rb') as cached:
+            values = pickle.load(cached)
+        os.utime(path)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if values.keys() != set(nodes):
+        return None
+    return {node: values[node] for node in nodes}
+
+
+def evict_cache(cache_dir: str, max_bytes: int, max_age_seconds: float):
+    """
+    Delete entries unused for longer than max_age_seconds, then least recently used
+    entries until the cache fits in max_bytes.
+    """
+    oldest_allowed = time.time() - max_age_seconds
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_SUFFIX):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:  # Removed by another process in the meantime
+                continue
+            if stat.st_mtime < oldest_allowed:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except FileNotFoundError:
+                    pass
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def store_cached_centrality(cache_dir: str, key: str, values: Dict[str, float],
+                            cache_size_mb: int = DEFAULT_CACHE_SIZE_MB, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+    """
+    Save the full per-node centrality vector under key, then evict stale and excess entries.
+    The file is written under a temporary name and renamed, so a concurrent run never reads a partial entry.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=cache_dir, delete=False) as tmp:
+        pickle.dump(dict(values), tmp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp.name, os.path.join(cache_dir, key + CACHE_SUFFIX))
+    evict_cache(cache_dir, cache_size_mb << 20, max_age_days * 86400)
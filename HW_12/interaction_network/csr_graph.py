@@ -0,0 +1,142 @@
+import heapq
+from typing import Dict
+from .edge_list import EdgeList, require_numpy, is_edge_list_file, load_edge_list, network_to_edge_list, load_network_json
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for the CSR engine
+    np = None
+
+
+class CSRGraph:
+    """
+    A directed, weighted interaction network stored as compressed sparse row arrays.
+
+    Out-edges of node i are indices[indptr[i]:indptr[i + 1]] with matching weights, and
+    the reversed graph (in-edges) is kept the same way. Node IDs follow the EdgeList name
+    table, which is the order NetworkX would see the nodes in, so rankings built from
+    these arrays break ties exactly like the NetworkX ones.
+    """
+
+    def __init__(self, edges: EdgeList):
+        require_numpy()
+        self.names = edges.names
+        self.sources = edges.sources
+        self.targets = edges.targets
+        self.weights = edges.weights
+        self.indptr, self.indices, self.edge_weights = self._compress(edges.sources, edges.targets, edges.weights)
+        self.in_indptr, self.in_indices, self.in_edge_weights = self._compress(edges.targets, edges.sources, edges.weights)
+
+    @classmethod
+    def from_file(cls, input_file):
+        """
+        Build the engine from a .npz edge list, or from the nested JSON (or JSON Lines) network.
+        """
+        if is_edge_list_file(input_file):
+            return cls(load_edge_list(input_file))
+        return cls(network_to_edge_list(load_network_json(input_file)))
+
+    def _compress(self, rows, cols, weights):
+        # Stable sort keeps each node's edges in their original order
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.names)), out=indptr[1:])
+        return indptr, cols[order], weights[order]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _as_dict(self, values) -> Dict[str, float]:
+        return dict(zip(self.names, values.tolist()))
+
+    def out_degree(self, weighted=False):
+        return np.bincount(self.sources, self.weights if weighted else None, minlength=len(self)).astype(np.int64)
+
+    def in_degree(self, weighted=False):
+        return np.bincount(self.targets, self.weights if weighted else None, minlength=len(self)).astype(np.int64)
+
+    def degree(self, weighted=False):
+        # Like DiGraph.degree, a self-loop counts once as an out-edge and once as an in-edge
+        return self.out_degree(weighted) + self.in_degree(weighted)
+
+    def degree_dict(self, weighted=False) -> Dict[str, int]:
+        return self._as_dict(self.degree(weighted))
+
+    def out_degree_dict(self, weighted=False) -> Dict[str, int]:
+        return self._as_dict(self.out_degree(weighted))
+
+    def in_degree_dict(self, weighted=False) -> Dict[str, int]:
+        return self._as_dict(self.in_degree(weighted))
+
+    def degree_centrality(self) -> Dict[str, float]:
+        """
+        Total degree over n - 1, computed with the same float operations as nx.degree_centrality.
+        """
+        if len(self) <= 1:
+            return dict.fromkeys(self.names, 1.0)
+        scale = 1.0 / (len(self) - 1.0)
+        return {name: degree * scale for name, degree in zip(self.names, self.degree().tolist())}
+
+    def _bfs_lengths(self, indptr, indices, source):
+        # Level-synchronous BFS: each step expands the whole frontier with array gathers
+        dist = np.full(len(self), -1, dtype=np.int64)
+        dist[source] = 0
+        frontier = np.array([source])
+        level = 0
+        while frontier.size:
+            level += 1
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            counts = ends - starts
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbors = indices[offsets]
+            frontier = np.unique(neighbors[dist[neighbors] < 0])
+            dist[frontier] = level
+        reached = dist >= 0
+        return int(reached.sum()), int(dist[reached].sum())
+
+    def _dijkstra_lengths(self, indptr, indices, weights, source):
+        # Plain heap Dijkstra with edge weights as distances, over the arrays as Python lists
+        dist = {}
+        heap = [(0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node in dist:
+                continue
+            dist[node] = d
+            for i in range(indptr[node], indptr[node + 1]):
+                if indices[i] not in dist:
+                    heapq.heappush(heap, (d + weights[i], indices[i]))
+        return len(dist), sum(dist.values())
+
+    def closeness_centrality(self, distance=None) -> Dict[str, float]:
+        """
+        Closeness from incoming distances with the Wasserman-Faust correction, as
+        nx.closeness_centrality computes it. Unweighted by default (BFS); with
+        distance='weight' the edge weights are used as distances (Dijkstra).
+        """
+        n = len(self)
+        closeness = {}
+        if distance is not None:
+            in_lists = self.in_indptr.tolist(), self.in_indices.tolist(), self.in_edge_weights.tolist()
+        for node, name in enumerate(self.names):
+            if distance is None:
+                reached, total = self._bfs_lengths(self.in_indptr, self.in_indices, node)
+            else:
+                reached, total = self._dijkstra_lengths(*in_lists, node)
+            reached -= 1  # The node itself
+            closeness[name] = reached / total * (reached / (n - 1)) if total > 0 and n > 1 else 0.0
+        return closeness
+
+    def to_networkx(self):
+        """
+        Build the equivalent NetworkX DiGraph, for the metrics this engine does not cover.
+        """
+        import networkx as nx  # Imported here so the engine itself never pays for it
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.names)
+        names = self.names
+        graph.add_weighted_edges_from(
+            (names[source], names[target], weight)
+            for source, target, weight in zip(self.sources.tolist(), self.targets.tolist(), self.weights.tolist()))
+        return graph
@@ -0,0 +1,105 @@
+import json
+from typing import Dict, List, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for the compact .npz network format
+    np = None
+
+EDGE_LIST_SUFFIX = '.npz'
+JSON_LINES_SUFFIX = '.jsonl'
+
+
+class EdgeList(NamedTuple):
+    """
+    An interaction network as a name <-> ID table plus parallel int32 arrays, one entry per edge:
+    names[sources[i]] spoke to names[targets[i]] weights[i] times.
+    """
+    names: List[str]
+    sources: "np.ndarray"
+    targets: "np.ndarray"
+    weights: "np.ndarray"
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("The compact .npz network format requires numpy (pip install numpy)")
+
+
+def is_edge_list_file(path):
+    return path.endswith(EDGE_LIST_SUFFIX)
+
+
+def is_json_lines_file(path):
+    return path.endswith(JSON_LINES_SUFFIX)
+
+
+def load_network_json(input_file) -> Dict[str, Dict[str, int]]:
+    """
+    Load a nested {speaker: {listener: count}} network from JSON, or from JSON Lines with
+    one {"speaker": ..., "listeners": {...}} object per line.
+    """
+    with open(input_file, 'r', encoding='utf-8') as infile:
+        if not is_json_lines_file(input_file):
+            return json.load(infile)
+        interaction_network = {}
+        for line in infile:
+            if line.strip():
+                record = json.loads(line)
+                interaction_network[record["speaker"]] = record["listeners"]
+        return interaction_network
+
+
+def network_to_edge_list(interaction_network: Dict[str, Dict[str, int]]) -> EdgeList:
+    """
+    Convert a nested {speaker: {listener: count}} network into an EdgeList.
+
+    IDs are handed out in the order a NetworkX graph would first see each node (speaker,
+    then listener, edge by edge), and edges keep the nested dict order, so a graph
+    rebuilt from the arrays has the same node and edge order as one built from the dict.
+    """
+    require_numpy()
+
+    name_ids = {}
+    sources, targets, weights = [], [], []
+
+    for speaker, listeners in interaction_network.items():
+        for listener, intrxn_count in listeners.items():
+            sources.append(name_ids.setdefault(speaker, len(name_ids)))
+            targets.append(name_ids.setdefault(listener, len(name_ids)))
+            weights.append(intrxn_count)
+
+    return EdgeList(list(name_ids),
+                    np.array(sources, dtype=np.int32),
+                    np.array(targets, dtype=np.int32),
+                    np.array(weights, dtype=np.int32))
+
+
+def edge_list_to_network(edges: EdgeList) -> Dict[str, Dict[str, int]]:
+    """
+    Convert an EdgeList back into a nested {speaker: {listener: count}} dict, in edge order.
+    """
+    interaction_network = {}
+    names = edges.names
+    for source, target, weight in zip(edges.sources.tolist(), edges.targets.tolist(), edges.weights.tolist()):
+        interaction_network.setdefault(names[source], {})[names[target]] = weight
+    return interaction_network
+
+
+def save_edge_list(edges: EdgeList, output_file):
+    """
+    Save an EdgeList as an uncompressed .npz archive of four arrays.
+    """
+    require_numpy()
+    np.savez(output_file, names=np.array(edges.names, dtype=str), sources=edges.sources,
+             targets=edges.targets, weights=edges.weights)
+
+
+def load_edge_list(input_file) -> EdgeList:
+    """
+    Load an EdgeList saved by save_edge_list. The arrays are read straight into memory
+    without any per-edge Python work.
+    """
+    require_numpy()
+    with np.load(input_file) as archive:
+        return EdgeList(archive["names"].tolist(), archive["sources"], archive["targets"], archive["weights"])
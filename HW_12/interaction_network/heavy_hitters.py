@@ -0,0 +1,83 @@
+import heapq
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, List, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch over speakers, holding at most `capacity` of them.
+
+    Each monitored speaker has a count, which overestimates their true number of lines by
+    at most `error`, and the listener counts seen while they were monitored. When a new
+    speaker arrives with the table full, the speaker with the smallest count is evicted and
+    the newcomer inherits that count as its error. The long tail is therefore never held:
+    memory is bounded by capacity speakers and their listeners.
+
+    It can be used directly as the interaction_network of fold_dialogue, which only ever does
+    interaction_network[speaker][listener] += 1: looking up a speaker counts one line for them.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Space-Saving capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.counts = {}     # speaker -> estimated lines spoken
+        self.errors = {}     # speaker -> maximum overestimate of that count
+        self.listeners = {}  # speaker -> {listener: interactions while monitored}
+        self.heap = []       # One (count, speaker) per monitored speaker, the count possibly outdated
+
+    def __getitem__(self, speaker):
+        self.add(speaker)
+        return self.listeners[speaker]
+
+    def add(self, speaker, count=1):
+        if speaker in self.counts:
+            self.counts[speaker] += count  # The hot path: no heap work
+            return
+
+        if len(self.counts) < self.capacity:
+            self.errors[speaker] = 0
+        else:
+            self.errors[speaker] = self._evict_min()
+        self.counts[speaker] = self.errors[speaker] + count
+        self.listeners[speaker] = defaultdict(int)
+        heapq.heappush(self.heap, (self.counts[speaker], speaker))
+
+    def _evict_min(self):
+        # Counts only grow, so a heap entry is a lower bound of its speaker's count: an entry
+        # that is still current is the true minimum, an outdated one is pushed back refreshed
+        while True:
+            count, speaker = heapq.heappop(self.heap)
+            if self.counts[speaker] == count:
+                del self.counts[speaker], self.errors[speaker], self.listeners[speaker]
+                return count
+            heapq.heappush(self.heap, (self.counts[speaker], speaker))
+
+    def min_count(self):
+        """
+        Upper bound on the true count of any speaker not in the table.
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """
+        The n speakers with the highest estimated counts, as (speaker, count, error), most first.
+        Ties keep first-admitted order, as top_k_keys does.
+        """
+        return [(speaker, count, self.errors[speaker])
+                for speaker, count in heapq.nlargest(n, self.counts.items(), key=itemgetter(1))]
+
+    def is_exact_top(self, n: int) -> bool:
+        """
+        True when the top n set is guaranteed correct: every reported speaker's lower bound
+        (count - error) is at least the highest count any other speaker could have.
+        """
+        ranked = heapq.nlargest(n + 1, self.counts.items(), key=itemgetter(1))
+        rest = self.min_count()
+        if len(ranked) > n:
+            rest = max(rest, ranked[n][1])
+        return all(count - self.errors[speaker] >= rest for speaker, count in ranked[:n])
+
+    def network(self, speakers: List[str]) -> Dict[str, Dict[str, int]]:
+        return {speaker: dict(self.listeners[speaker]) for speaker in speakers}
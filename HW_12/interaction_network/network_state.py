@@ -0,0 +1,265 @@
+import io
+import os
+import csv
+import json
+import hashlib
+import sqlite3
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from .build import fold_dialogue
+from .prune import write_network
+
+# Bytes before the saved offset that must be unchanged for an append to be safe
+FINGERPRINT_BYTES = 4096
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# The state is a SQLite database updated in place: a run upserts only the edges and speaker
+# totals its appended rows touched, and reads the top speakers off an index, so it costs
+# time proportional to the append (plus the top_n network it writes), not to the whole network.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS speakers (
+    speaker TEXT PRIMARY KEY,
+    first_seen INTEGER NOT NULL,
+    total INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS speakers_ranked ON speakers (total DESC, first_seen);
+CREATE TABLE IF NOT EXISTS edges (
+    speaker TEXT NOT NULL,
+    listener TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (speaker, listener));
+CREATE INDEX IF NOT EXISTS edges_in_order ON edges (speaker, position);
+"""
+
+
+class NetworkState:
+    """
+    Append-mode state kept in a SQLite database: how far into the transcript CSV we have
+    read and the parser's current speaker at that point (in the meta table), the raw
+    (untruncated) edge counts, every speaker's total lines spoken, and the speakers of the
+    last filtered network.
+
+    Speakers are ranked by total lines, most first, ties in first-seen order (the order
+    top_k_keys breaks ties in); listeners keep the order they were first seen in. Nothing is
+    committed until commit(), so an interrupted run leaves the previous state intact.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def add_counts(self, delta: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+        """
+        Add the edge counts of delta, keeping first-seen order for new speakers and listeners.
+        Returns how many lines each speaker of delta gained.
+        """
+        next_position = self.get("next_position", 0)
+        next_speaker = self.get("next_speaker", 0)
+        gained = {}
+        for speaker, listeners in delta.items():
+            for listener, intrxn_count in listeners.items():
+                updated = self.conn.execute("UPDATE edges SET count = count + ? WHERE speaker = ? AND listener = ?",
+                                            (intrxn_count, speaker, listener))
+                if updated.rowcount == 0:
+                    self.conn.execute("INSERT INTO edges (speaker, listener, position, count) VALUES (?, ?, ?, ?)",
+                                      (speaker, listener, next_position, intrxn_count))
+                    next_position += 1
+            gained[speaker] = sum(listeners.values())
+            updated = self.conn.execute("UPDATE speakers SET total = total + ? WHERE speaker = ?", (gained[speaker], speaker))
+            if updated.rowcount == 0:
+                self.conn.execute("INSERT INTO speakers (speaker, first_seen, total) VALUES (?, ?, ?)",
+                                  (speaker, next_speaker, gained[speaker]))
+                next_speaker += 1
+        self.set("next_position", next_position)
+        self.set("next_speaker", next_speaker)
+        return gained
+
+    def top(self, n: int) -> List[str]:
+        # Read off the speakers_ranked index, without visiting the other speakers
+        rows = self.conn.execute("SELECT speaker FROM speakers ORDER BY total DESC, first_seen LIMIT ?", (n,))
+        return [speaker for speaker, in rows]
+
+    def network(self, speakers: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        The raw counts of the given speakers only, in the given order.
+        """
+        return {speaker: dict(self.conn.execute("SELECT listener, count FROM edges WHERE speaker = ? ORDER BY position",
+                                                (speaker,)))
+                for speaker in speakers}
+
+    def import_legacy(self, state: Dict[str, Any]):
+        """
+        Copy in a state saved by the old whole-file JSON format.
+        """
+        position = 0
+        for speaker, listeners in state["network"].items():
+            for listener, intrxn_count in listeners.items():
+                self.conn.execute("INSERT INTO edges (speaker, listener, position, count) VALUES (?, ?, ?, ?)",
+                                  (speaker, listener, position, intrxn_count))
+                position += 1
+        self.conn.executemany("INSERT INTO speakers (speaker, first_seen, total) VALUES (?, ?, ?)",
+                              ((speaker, first_seen, total) for first_seen, (speaker, total) in enumerate(state["totals"].items())))
+        for key in ("offset", "fingerprint", "speaker", "top_speakers"):
+            self.set(key, state[key])
+        self.set("next_position", position)
+        self.set("next_speaker", len(state["totals"]))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def open_network_state(state_file: str) -> NetworkState:
+    """
+    Open (or create) the state database at state_file. A state file left by the old JSON
+    format is converted once, in place.
+    """
+    legacy = None
+    if os.path.exists(state_file):
+        with open(state_file, 'rb') as raw:
+            header = raw.read(len(SQLITE_HEADER))
+        if header and header != SQLITE_HEADER:
+            with open(state_file, 'r', encoding='utf-8') as input_file:
+                legacy = json.load(input_file)
+
+    if legacy is None:
+        return NetworkState(state_file)
+
+    # Build the database next to the JSON state and only then replace it, so a failed
+    # conversion keeps the old state
+    converted_file = f"{state_file}.{os.getpid()}.tmp"
+    try:
+        converted = NetworkState(converted_file)
+        converted.import_legacy(legacy)
+        converted.commit()
+        converted.close()
+        os.replace(converted_file, state_file)
+    finally:
+        if os.path.exists(converted_file):
+            os.remove(converted_file)
+    print(f"Converted the JSON state in {state_file} to a database")
+    return NetworkState(state_file)
+
+
+def tail_fingerprint(data: bytes) -> str:
+    """
+    Hash of the last FINGERPRINT_BYTES bytes already read, to notice a transcript that
+    was edited or replaced rather than appended to.
+    """
+    return hashlib.sha1(data[-FINGERPRINT_BYTES:]).hexdigest()
+
+
+def fold_into_state(state: NetworkState, rows) -> Dict[str, int]:
+    """
+    Fold more dialogue rows into the state's raw counts, continuing from its saved speaker.
+    Returns how many lines each speaker gained.
+    """
+    delta = defaultdict(lambda: defaultdict(int))
+    state.set("speaker", fold_dialogue(rows, delta, state.get("speaker")))
+    return state.add_counts(delta)
+
+
+def refresh_top_speakers(state: NetworkState, gained: Dict[str, int], top_n: int = 101) -> Tuple[List[str], bool]:
+    """
+    Return the new top_n speakers, and whether the top_n network changed (different
+    speakers, or new counts for one of them).
+    """
+    top_speakers = state.top(top_n)
+    changed = top_speakers != state.get("top_speakers", []) or not gained.keys().isdisjoint(top_speakers)
+    state.set("top_speakers", top_speakers)
+    return top_speakers, changed
+
+
+def read_appended_rows(input_file, offset: int, fingerprint: str) -> Optional[Tuple[List[List[str]], int]]:
+    """
+    Read the complete rows appended to the transcript since offset.
+
+    Returns the rows and the new offset, or None if the bytes already read have changed.
+    A last record without its newline may still be being written, so it is left for the next run.
+    """
+    with open(input_file, 'rb') as raw:
+        raw.seek(max(0, offset - FINGERPRINT_BYTES))
+        already_read = raw.read(min(offset, FINGERPRINT_BYTES))
+        if len(already_read) < min(offset, FINGERPRINT_BYTES) or tail_fingerprint(already_read) != fingerprint:
+            print(f"{input_file} was modified, not just appended to; rebuild without the old state")
+            return None
+        appended = raw.read()
+
+    # Stop after the last newline outside a quoted field, i.e. at the end of a whole record
+    end = position = quotes = 0
+    for line in appended.split(b"\n")[:-1]:
+        position += len(line) + 1
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            end = position
+    complete = appended[:end]
+    # Decode with universal newlines, exactly as the full build opens the file
+    rows = list(csv.reader(io.TextIOWrapper(io.BytesIO(complete), encoding='utf-8')))
+    return rows, offset + len(complete)
+
+
+def update_interaction_network(input_file, state: NetworkState):
+    """
+    Fold the rows appended to input_file since the last run into the state.
+
+    Only the new rows are parsed, starting from the saved speaker, so the raw counts end up
+    exactly as a full rebuild would produce them. Returns how many lines each speaker gained,
+    or None if the transcript cannot be resumed.
+    """
+    appended = read_appended_rows(input_file, state.get("offset", 0), state.get("fingerprint", tail_fingerprint(b"")))
+    if appended is None:
+        return None
+    rows, offset = appended
+
+    gained = fold_into_state(state, rows)
+
+    with open(input_file, 'rb') as raw:
+        raw.seek(max(0, offset - FINGERPRINT_BYTES))
+        state.set("fingerprint", tail_fingerprint(raw.read(min(offset, FINGERPRINT_BYTES))))
+    state.set("offset", offset)
+
+    print(f"Read {len(rows)} new rows from {input_file}")
+    return gained
+
+
+def append_interaction_network(input_file, output_file, state_file, top_n=101, compact=False):
+    """
+    Incremental build: update the raw counts saved in state_file with the newly appended rows,
+    then refresh the top_n filtered network. The output is only rewritten when the top_n
+    speakers or any of their counts changed, so downstream stats can be skipped otherwise.
+    """
+    try:
+        state = open_network_state(state_file)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"Error reading state file: {e}")
+        return
+
+    try:
+        changed = update_interaction_network(input_file, state)
+        if changed is None:
+            return
+
+        top_speakers, top_changed = refresh_top_speakers(state, changed, top_n)
+        if top_changed:
+            write_network(state.network(top_speakers), output_file, compact)
+        else:
+            print(f"No change among the top {top_n} speakers, {output_file} left as is")
+
+        state.commit()
+        print(f"Network state written to {state_file}")
+    finally:
+        state.close()
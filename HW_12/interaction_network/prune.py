@@ -0,0 +1,54 @@
+import json
+from .ranking import top_k_keys
+from .edge_list import is_edge_list_file, is_json_lines_file, network_to_edge_list, save_edge_list
+
+
+def top_speakers(interactions_dict, top_n=101):
+    # speakers and all their speaks
+    speaks_counts = {}
+
+    # calculate total lines spoken by given speaker
+    for speaker, listener_dict in interactions_dict.items():
+        times_spoken = sum(listener_dict.values())  # add up all interactions for this speaker
+        speaks_counts[speaker] = times_spoken
+
+    # Keep the top_n speakers by total lines spoken, most to least, without sorting everyone
+    return top_k_keys(speaks_counts, top_n)
+
+
+def prune(interactions_dict, top_n=101, speakers=None):
+    """
+    The network restricted to its top_n speakers (or to the given speakers), most talkative first.
+    """
+    filtered_interactions_dict = {} # new dict with only those characters
+
+    for speaker in (top_speakers(interactions_dict, top_n) if speakers is None else speakers):
+        filtered_interactions_dict[speaker] = interactions_dict[speaker]
+
+    return filtered_interactions_dict
+
+
+def write_network(filtered_interactions_dict, output_file, compact=False, bounds=None):
+    # Save the filtered interaction network, as compact ID arrays for a .npz output, one speaker
+    # per line for .jsonl (with their line count bounds, if estimated), else as JSON
+    if is_edge_list_file(output_file):
+        save_edge_list(network_to_edge_list(filtered_interactions_dict), output_file)
+    elif is_json_lines_file(output_file):
+        with open(output_file, 'w', encoding='utf-8') as network_jsonl:
+            for speaker, listeners in filtered_interactions_dict.items():
+                record = {"speaker": speaker, "listeners": listeners}
+                if bounds:
+                    record["lines"], record["error"] = bounds[speaker]
+                network_jsonl.write(json.dumps(record, separators=(',', ':')) + "\n")
+    else:
+        with open(output_file, 'w', encoding='utf-8') as network_json:
+            if compact:
+                json.dump(filtered_interactions_dict, network_json, separators=(',', ':'))
+            else:
+                json.dump(filtered_interactions_dict, network_json, indent=4)
+
+    print(f"Filtered interaction network saved to {output_file}")
+
+
+def clean_up_network(interactions_dict, output_file, top_n=101, compact=False):
+    write_network(prune(interactions_dict, top_n), output_file, compact)
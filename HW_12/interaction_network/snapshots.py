@@ -0,0 +1,365 @@
+import json
+import heapq
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Dict, Iterator, Tuple
+from .ranking import top_k_keys
+from .edge_list import network_to_edge_list
+from .csr_graph import CSRGraph
+from .build import iter_episode_networks
+from .prune import prune
+from .stats import check_approx
+
+
+class SlidingWindow:
+    """
+    Running interaction network of the last `window` episodes.
+
+    An episode entering the window adds its counts and the one leaving subtracts its own, so
+    moving the window costs the size of those two episodes (plus re-ordering the listeners of
+    the leaving episode's speakers) rather than a merge of the whole window. Every speaker and
+    edge also remembers where it occurs in the window's episodes, which gives the first-seen
+    order a network built from the window's rows alone would have.
+    """
+
+    def __init__(self, window=1):
+        self.window = window
+        self.episodes = deque()  # (sequence, episode, network) of the episodes in the window
+        self.sequence = 0
+        self.counts = {}         # speaker -> {listener: interactions within the window}, in first-seen order
+        self.lines = {}          # speaker -> lines spoken within the window
+        self.speaker_seen = {}   # speaker -> deque of (sequence, position) of each episode they speak in
+        self.edge_seen = {}      # speaker -> {listener: deque of (sequence, position) likewise}
+        self.first_seen = {}     # speaker -> {listener: (sequence, position) of the edge's first occurrence}
+        self.touched = set()     # Edges whose count changed since the last snapshot
+        self.kept = []           # Speakers of the last snapshot
+
+    def is_full(self):
+        return len(self.episodes) == self.window
+
+    def add(self, episode, network):
+        """
+        Slide the window forward by one episode network, dropping the oldest one if it is full.
+        """
+        sequence = self.sequence
+        self.sequence += 1
+        self.episodes.append((sequence, episode, network))
+
+        for position, (speaker, listeners) in enumerate(network.items()):
+            if not listeners:
+                continue  # A merged window only holds speakers with a listener
+            self.speaker_seen.setdefault(speaker, deque()).append((sequence, position))
+            counts = self.counts.setdefault(speaker, {})
+            edge_seen = self.edge_seen.setdefault(speaker, {})
+            first_seen = self.first_seen.setdefault(speaker, {})
+            self.lines[speaker] = self.lines.get(speaker, 0) + sum(listeners.values())
+            for listener_position, (listener, intrxn_count) in enumerate(listeners.items()):
+                seen_at = (sequence, listener_position)
+                if listener in counts:
+                    counts[listener] += intrxn_count
+                    edge_seen[listener].append(seen_at)
+                else:  # A new edge is seen after every other, so it goes last
+                    counts[listener] = intrxn_count
+                    edge_seen[listener] = deque((seen_at,))
+                    first_seen[listener] = seen_at
+                self.touched.add((speaker, listener))
+
+        if len(self.episodes) > self.window:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        _, _, network = self.episodes.popleft()
+        moved = []  # Speakers with an edge now first seen in a later episode, to put back in order
+
+        # The oldest episode is the first entry of everything that occurs in it
+        for speaker, listeners in network.items():
+            if not listeners:
+                continue
+            speaker_seen = self.speaker_seen[speaker]
+            speaker_seen.popleft()
+            if not speaker_seen:
+                del self.speaker_seen[speaker]
+
+            counts = self.counts[speaker]
+            edge_seen = self.edge_seen[speaker]
+            first_seen = self.first_seen[speaker]
+            kept_edge = False
+            for listener, intrxn_count in listeners.items():
+                listener_seen = edge_seen[listener]
+                listener_seen.popleft()
+                if listener_seen:
+                    counts[listener] -= intrxn_count
+                    first_seen[listener] = listener_seen[0]
+                    kept_edge = True
+                else:
+                    del counts[listener]
+                    del edge_seen[listener]
+                    del first_seen[listener]
+                self.touched.add((speaker, listener))
+
+            if counts:
+                self.lines[speaker] -= sum(listeners.values())
+                if kept_edge:
+                    moved.append(speaker)
+            else:
+                del self.counts[speaker]
+                del self.edge_seen[speaker]
+                del self.first_seen[speaker]
+                del self.lines[speaker]
+
+        # The dropped episode's edges were first in their speaker's order. Those still in the
+        # window are now first seen later and must move; the rest of the order is unchanged,
+        # so the sort only merges them into an already sorted run
+        for speaker in moved:
+            counts = self.counts[speaker]
+            self.counts[speaker] = {listener: counts[listener]
+                                    for listener in sorted(counts, key=self.first_seen[speaker].__getitem__)}
+
+    def snapshot(self, top_n=101):
+        """
+        The window's network filtered to its top_n speakers, as prune would return it for the
+        merged window, and its changes since the last snapshot: {(speaker, listener): weight},
+        0 for an edge that left. Only touched edges and speakers entering or leaving the
+        top_n are looked at for the changes.
+        """
+        # Most lines first, ties by first appearance in the window, like top_speakers
+        lines, speaker_seen = self.lines, self.speaker_seen
+        kept = heapq.nlargest(top_n, speaker_seen, key=lambda speaker: (lines[speaker], -speaker_seen[speaker][0][0],
+                                                                         -speaker_seen[speaker][0][1]))
+        network = {speaker: dict(self.counts[speaker]) for speaker in kept}
+
+        kept_set, previous = set(kept), set(self.kept)
+        changes = {}
+        for speaker, listener in self.touched:
+            if speaker in kept_set:
+                changes[(speaker, listener)] = self.counts.get(speaker, {}).get(listener, 0)
+            elif speaker in previous:
+                changes[(speaker, listener)] = 0
+        for speaker in kept_set - previous:
+            for listener, intrxn_count in self.counts[speaker].items():
+                changes[(speaker, listener)] = intrxn_count
+        for speaker in previous - kept_set:
+            for listener in self.counts.get(speaker, ()):
+                changes[(speaker, listener)] = 0
+
+        self.touched.clear()
+        self.kept = kept
+        return network, changes
+
+
+def iter_window_changes(source, window=1, top_n=101):
+    """
+    Yield (first_episode, last_episode, network, changes) for every full window of `window`
+    consecutive episodes, each network filtered to its top_n speakers and changes holding its
+    edges that differ from the previous window's network (see SlidingWindow.snapshot).
+
+    Only the per-episode networks of the current window are kept, and the window network is
+    updated in place as episodes enter and leave it. Its speakers and listeners are in
+    first-seen order, exactly as if the window's rows had been built on their own, and its
+    top_n speakers (like clean_up_network) break ties the same way.
+    """
+    sliding_window = SlidingWindow(window)
+
+    for episode, episode_network in iter_episode_networks(source):
+        sliding_window.add(episode, episode_network)
+        if not sliding_window.is_full():
+            continue  # Only full windows
+
+        network, changes = sliding_window.snapshot(top_n)
+        yield sliding_window.episodes[0][1], episode, network, changes
+
+
+def iter_window_networks(source, window=1, top_n=101):
+    """
+    Yield (first_episode, last_episode, network) for every full window of `window`
+    consecutive episodes, each network filtered to its top_n speakers (see iter_window_changes).
+    """
+    for first_episode, last_episode, network, _ in iter_window_changes(source, window, top_n):
+        yield first_episode, last_episode, network
+
+
+def build_snapshots(input_file, output_file, window=1, top_n=101):
+    """
+    Write one filtered network per episode (window=1) or per sliding window of `window`
+    consecutive episodes, as JSON Lines: {"first_episode", "last_episode", "network"}.
+    """
+    num_snapshots = 0
+
+    with open(output_file, 'w', encoding='utf-8') as snapshots_jsonl:
+        for first_episode, last_episode, snapshot in iter_window_networks(input_file, window, top_n):
+            record = {"first_episode": first_episode, "last_episode": last_episode, "network": snapshot}
+            snapshots_jsonl.write(json.dumps(record, separators=(',', ':')) + "\n")
+            num_snapshots += 1
+
+    print(f"{num_snapshots} network snapshots saved to {output_file}")
+
+
+def is_dialogue_csv(input_file):
+    return isinstance(input_file, str) and input_file.lower().endswith('.csv')
+
+
+def iter_snapshots(input_file) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the {"first_episode", "last_episode", "network"} records written by
+    build_interaction_network.py --snapshots.
+    """
+    with open(input_file, 'r', encoding='utf-8') as snapshots_jsonl:
+        for line in snapshots_jsonl:
+            if line.strip():
+                yield json.loads(line)
+
+
+class DegreeTracker:
+    """
+    Degree (in + out edges) and weighted out-degree of every character, carried from one
+    snapshot to the next. Only the edges given to apply() touch the counters.
+    """
+
+    def __init__(self):
+        self.edges = {}  # (speaker, listener) -> weight in the current snapshot
+        self.degree = defaultdict(int)
+        self.weighted_out_degree = defaultdict(int)
+
+    def apply(self, changes: Dict[Tuple[str, str], int]) -> bool:
+        """
+        Move to the next snapshot given its changed edges, {(speaker, listener): weight} with
+        weight 0 for an edge that is gone. Returns whether any edge changed.
+        """
+        changed = False
+
+        for edge, weight in changes.items():
+            old_weight = self.edges.get(edge, 0)
+            if weight == old_weight:
+                continue
+            speaker, listener = edge
+            if not old_weight:
+                self.degree[speaker] += 1
+                self.degree[listener] += 1
+            elif not weight:
+                self.degree[speaker] -= 1
+                self.degree[listener] -= 1
+            self.weighted_out_degree[speaker] += weight - old_weight
+            if weight:
+                self.edges[edge] = weight
+            else:
+                del self.edges[edge]
+            changed = True
+
+        return changed
+
+    def update(self, network: Dict[str, Dict[str, int]]) -> bool:
+        """
+        Move to the next snapshot given its whole network, e.g. one read back from a snapshots
+        file. Finding the changed edges is a diff over every edge, as costly as reading the
+        snapshot was. Returns whether any edge changed.
+        """
+        changes = {(speaker, listener): weight for speaker, listeners in network.items()
+                   for listener, weight in listeners.items()}
+        for edge in self.edges:
+            if edge not in changes:
+                changes[edge] = 0
+        return self.apply(changes)
+
+
+def snapshot_centralities(network: Dict[str, Dict[str, int]], top_k=3, metrics=("closeness", "betweenness"),
+                          approx=None, seed=None) -> Dict[str, Any]:
+    """
+    Top closeness and betweenness characters of one snapshot, computed exactly as
+    compute_network_stats does for a single network.
+    """
+    graph = CSRGraph(network_to_edge_list(network))
+    rankings = {}
+
+    if approx is not None:
+        approx = min(approx, len(graph))
+
+    if "closeness" in metrics:
+        if approx is None:
+            closeness_centrality = graph.closeness_centrality()
+        else:
+            from .centrality import compute_closeness
+            closeness_centrality = compute_closeness(graph.to_networkx(), 1, approx, seed)
+        rankings["closeness"] = top_k_keys(closeness_centrality, top_k)
+
+    if "betweenness" in metrics:
+        from .centrality import compute_betweenness
+        betweenness_centrality = compute_betweenness(graph.to_networkx(), 1, approx, seed, weight='weight')
+        rankings["betweenness"] = top_k_keys(betweenness_centrality, top_k)
+
+    return rankings
+
+
+def _snapshot_centralities(args):
+    return snapshot_centralities(*args)
+
+
+def compute_snapshot_stats(input_file, output_file, top_k=3, workers=1, metrics=("degree", "weighted_degree", "closeness", "betweenness"),
+                           approx=None, seed=None, window=1, top_n=101):
+    """
+    Rank the characters of every snapshot in one run and write one JSON line per snapshot.
+
+    input_file is a snapshots .jsonl from build_snapshots, or a dialogue CSV whose windows of
+    `window` episodes (each filtered to its top_n speakers) are built on the fly.
+    Degree rankings come from a DegreeTracker that only follows the edges that changed between
+    adjacent snapshots: for a CSV these come straight from the sliding window, for a snapshots
+    file they are found by diffing each snapshot as it is read. NetworkX has no warm start, so
+    closeness and betweenness are only reused for a snapshot whose network did not change at
+    all; with workers > 1 the snapshots that need them are spread over a process pool.
+    """
+    check_approx(approx)
+    tracker = DegreeTracker()
+    records = []
+    jobs = []  # (record index, network) of the snapshots needing closeness/betweenness
+    path_metrics = tuple(metric for metric in metrics if metric in ("closeness", "betweenness"))
+
+    if is_dialogue_csv(input_file):
+        snapshots = iter_window_changes(input_file, window, top_n)
+    else:
+        snapshots = ((snapshot["first_episode"], snapshot["last_episode"], snapshot["network"], None)
+                     for snapshot in iter_snapshots(input_file))
+
+    for first_episode, last_episode, network, changes in snapshots:
+        changed = tracker.update(network) if changes is None else tracker.apply(changes)
+        record = {"first_episode": first_episode, "last_episode": last_episode}
+
+        # Characters in the order a NetworkX graph of this snapshot would hold them
+        nodes = list(dict.fromkeys(chain.from_iterable((speaker, listener) for speaker, listeners in network.items()
+                                                       for listener in listeners)))
+
+        if "degree" in metrics:
+            if len(nodes) > 1:
+                scale = 1.0 / (len(nodes) - 1.0)
+                degree_centrality = {node: tracker.degree[node] * scale for node in nodes}
+            else:
+                degree_centrality = dict.fromkeys(nodes, 1)  # As nx.degree_centrality
+            record["degree"] = top_k_keys(degree_centrality, top_k)
+        if "weighted_degree" in metrics:
+            record["weighted_degree"] = top_k_keys({node: tracker.weighted_out_degree[node] for node in nodes}, top_k)
+
+        if path_metrics:
+            if changed or not records:
+                jobs.append((len(records), network))
+            else:
+                record.update({metric: None for metric in path_metrics})  # Filled from the previous snapshot below
+        records.append(record)
+
+    tasks = [(network, top_k, path_metrics, approx, seed) for _, network in jobs]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_snapshot_centralities, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        results = [_snapshot_centralities(task) for task in tasks]
+
+    for (index, _), rankings in zip(jobs, results):
+        records[index].update(rankings)
+    for previous, record in zip(records, records[1:]):
+        for metric in path_metrics:
+            if record[metric] is None:
+                record[metric] = previous[metric]  # Unchanged network, same rankings
+
+    with open(output_file, 'w', encoding='utf-8') as stats_jsonl:
+        for record in records:
+            stats_jsonl.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+    print(f"Statistics for {len(records)} snapshots saved to {output_file}")
@@ -0,0 +1,196 @@
+import json
+from .ranking import top_k_keys, top_k_items
+from .edge_list import EdgeList, is_edge_list_file, load_edge_list, load_network_json, network_to_edge_list
+from .csr_graph import CSRGraph
+from .centrality_cache import (graph_fingerprint, cache_key, load_cached_centrality, store_cached_centrality,
+                               DEFAULT_CACHE_SIZE_MB, DEFAULT_MAX_AGE_DAYS)
+
+METRICS = ["degree", "weighted_degree", "closeness", "betweenness"]
+MIN_APPROX = 2  # Fewer pivots divide by zero when rescaling betweenness (0) or leave it undefined (1)
+
+
+def check_approx(approx):
+    # A pivot count that cannot give a meaningful estimate is an error, not a crash deep in NetworkX
+    if approx is not None and approx < MIN_APPROX:
+        raise ValueError(f"approx must sample at least {MIN_APPROX} pivot nodes, got {approx}")
+
+
+def require_networkx():
+    # Imported on demand: the csr engine only needs NetworkX for betweenness
+    try:
+        import networkx
+    except ImportError:
+        raise ImportError("This metric requires networkx (pip install networkx), or use --engine csr without it")
+    return networkx
+
+
+def networkx_graph(network):
+    """
+    The NetworkX DiGraph of a nested {speaker: {listener: count}} network or an EdgeList,
+    with nodes in the order the JSON network file would add them.
+    """
+    nx = require_networkx()
+
+    # Instantiate a directed graph using NetworkX
+    InteractionGraph = nx.DiGraph()
+
+    if isinstance(network, EdgeList):
+        # Compact edge list: nodes are stored in the order the JSON path would add them
+        InteractionGraph.add_nodes_from(network.names)
+        names = network.names
+        InteractionGraph.add_weighted_edges_from(
+            (names[source], names[target], weight)
+            for source, target, weight in zip(network.sources.tolist(), network.targets.tolist(), network.weights.tolist()))
+        return InteractionGraph
+
+    # Add edges with weights
+    for speaker, listeners in network.items():
+        for listener, intrxn_count in listeners.items():
+            InteractionGraph.add_edge(speaker, listener, weight=intrxn_count)
+
+    return InteractionGraph
+
+
+def load_interaction_graph(input_file):
+    if is_edge_list_file(input_file):
+        return networkx_graph(load_edge_list(input_file))
+
+    # Load the json network
+    return networkx_graph(load_network_json(input_file))
+
+
+def compute_stats(network, top_k=3, workers=1, approx=None, seed=None, report_error=False, engine='networkx',
+                  metrics=METRICS, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                  cache_max_age_days=DEFAULT_MAX_AGE_DAYS, verbose=False):
+    """
+    Rank the top_k characters of an in-memory network by each of the requested metrics.
+
+    network is a nested {speaker: {listener: count}} dict (as returned by build or prune), an
+    EdgeList, a CSRGraph or, with the networkx engine, a NetworkX DiGraph. Returns
+    {metric: [character, ...]}, the same rankings compute_network_stats writes to its file.
+    """
+    check_approx(approx)
+
+    if engine == 'csr':
+        # NumPy arrays cover degree, weighted degree and exact closeness; a NetworkX graph
+        # is only built if betweenness, or parallel/approximate closeness, is requested
+        if isinstance(network, CSRGraph):
+            graph = network
+        elif isinstance(network, EdgeList):
+            graph = CSRGraph(network)
+        elif isinstance(network, dict):
+            graph = CSRGraph(network_to_edge_list(network))
+        else:
+            raise TypeError("The csr engine needs a network dict, an EdgeList or a CSRGraph")
+        InteractionGraph = None
+    elif isinstance(network, CSRGraph):
+        InteractionGraph = network.to_networkx()
+    elif isinstance(network, (dict, EdgeList)):
+        InteractionGraph = networkx_graph(network)
+    else:
+        InteractionGraph = network
+
+    # approx: estimate from that many sampled pivot nodes instead of every node
+    if approx is not None:
+        approx = min(approx, len(graph) if InteractionGraph is None else InteractionGraph.number_of_nodes())
+
+    # Cache full closeness/betweenness vectors by graph fingerprint and parameters. An
+    # unseeded sample would give different values every run, so it is never cached.
+    use_cache = cache_dir is not None and (approx is None or seed is not None)
+    if use_cache:
+        if InteractionGraph is None:
+            nodes = graph.names
+            edges = zip([nodes[source] for source in graph.sources.tolist()],
+                        [nodes[target] for target in graph.targets.tolist()], graph.weights.tolist())
+        else:
+            nodes = list(InteractionGraph)
+            edges = InteractionGraph.edges(data='weight')
+        fingerprint = graph_fingerprint(nodes, edges)
+        params = {"approx": approx, "seed": seed if approx is not None else None}
+        closeness_key = cache_key(fingerprint, "closeness", dict(params, weight=None))
+        betweenness_key = cache_key(fingerprint, "betweenness", dict(params, weight='weight'))
+
+    stats = {}
+
+    if "degree" in metrics:
+        # degree centrality (unweighted) via library function
+        if InteractionGraph is None:
+            degree_centrality = graph.degree_centrality()
+            foo = graph.degree_dict(weighted=True)
+        else:
+            degree_centrality = require_networkx().degree_centrality(InteractionGraph) # what does it return??
+            # foo = nx.degree_centrality(InteractionGraph, we) # what does it return??
+            foo = InteractionGraph.degree(weight='weight')
+        stats["degree"] = top_k_keys(degree_centrality, top_k)
+        top_degree2 = top_k_items(dict(foo), top_k)
+        if verbose:
+            print(top_degree2)
+
+    if "weighted_degree" in metrics:
+        # weighted degree centrality (sum of edge weights)
+        if InteractionGraph is None:
+            weighted_degree_centrality = graph.out_degree_dict(weighted=True)
+        else:
+            weighted_degree_centrality = {
+                character: sum(data["weight"] for _, _, data in InteractionGraph.edges(character, data=True))
+                for character in InteractionGraph.nodes
+            }
+        stats["weighted_degree"] = top_k_keys(weighted_degree_centrality, top_k) # highest values first, top k only
+
+    if "closeness" in metrics:
+        closeness_centrality = load_cached_centrality(cache_dir, closeness_key, nodes) if use_cache else None
+        if closeness_centrality is not None:
+            if verbose:
+                print("Closeness centrality loaded from cache")
+        else:
+            if InteractionGraph is None and approx is None and workers <= 1:
+                closeness_centrality = graph.closeness_centrality()
+            else:
+                from .centrality import compute_closeness, centrality_error
+                if InteractionGraph is None:
+                    InteractionGraph = graph.to_networkx()
+                closeness_centrality = compute_closeness(InteractionGraph, workers, approx, seed)
+                if approx is not None and report_error:
+                    # Exact values for comparison, reusing the worker pool settings
+                    exact_closeness = compute_closeness(InteractionGraph, workers)
+                    print(f"Closeness error with {approx} pivots: {centrality_error(exact_closeness, closeness_centrality, top_k)}")
+            if use_cache:
+                store_cached_centrality(cache_dir, closeness_key, closeness_centrality, cache_size_mb, cache_max_age_days)
+        stats["closeness"] = top_k_keys(closeness_centrality, top_k)
+
+    if "betweenness" in metrics:
+        betweenness_centrality = load_cached_centrality(cache_dir, betweenness_key, nodes) if use_cache else None
+        if betweenness_centrality is not None:
+            if verbose:
+                print("Betweenness centrality loaded from cache")
+        else:
+            from .centrality import compute_betweenness, centrality_error
+            if InteractionGraph is None:
+                InteractionGraph = graph.to_networkx()
+            betweenness_centrality = compute_betweenness(InteractionGraph, workers, approx, seed, weight='weight')
+            if approx is not None and report_error:
+                exact_betweenness = compute_betweenness(InteractionGraph, workers, weight='weight')
+                print(f"Betweenness error with {approx} pivots: {centrality_error(exact_betweenness, betweenness_centrality, top_k)}")
+            if use_cache:
+                store_cached_centrality(cache_dir, betweenness_key, betweenness_centrality, cache_size_mb, cache_max_age_days)
+        stats["betweenness"] = top_k_keys(betweenness_centrality, top_k)
+
+    return stats
+
+
+def compute_network_stats(input_file, output_file, top_k=3, workers=1, approx=None, seed=None, report_error=False,
+                          engine='networkx', metrics=METRICS, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                          cache_max_age_days=DEFAULT_MAX_AGE_DAYS):
+    if engine == 'csr':
+        network = CSRGraph.from_file(input_file)
+    else:
+        network = load_interaction_graph(input_file)
+
+    stats = compute_stats(network, top_k, workers, approx, seed, report_error, engine, metrics,
+                          cache_dir, cache_size_mb, cache_max_age_days, verbose=True)
+
+    # Save the results to a JSON file
+    with open(output_file, 'w', encoding='utf-8') as outfile:
+        json.dump(stats, outfile, indent=4)
+
+    print(f"Network statistics saved to {output_file}")
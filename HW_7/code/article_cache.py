@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Durable scrape cache: one SQLite row per article URL, written as soon as that article is
+# fetched, so a crash mid-run keeps everything fetched so far. Lookups go through the primary
+# key index instead of loading the whole cache, and entries carry the ETag/Last-Modified
+# validators the server sent so stale ones can be revalidated with a conditional request.
+# The front page's validators and carousel hash are kept too, per output file, so a poll can
+# tell that nothing changed since the output was last written.
+
+CACHE_DB = 'cache.db'
+LEGACY_CACHE_FILE = 'cache.json'  # The old whole-file JSON cache, imported once into a new database
+MAX_ENTRIES = 10_000  # Least recently used articles beyond this are evicted
+
+FIELDS = ("publication_date", "author", "blurb")
+
+
+class ArticleCache:
+    def __init__(self, path=CACHE_DB, ttl=None, max_entries=MAX_ENTRIES):
+        # ttl: seconds an entry is used without revalidation (None: forever, like the old cache)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()  # Articles finish on worker threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the per-article writes
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS articles (
+                                 url TEXT PRIMARY KEY,
+                                 publication_date TEXT NOT NULL,
+                                 author TEXT NOT NULL,
+                                 blurb TEXT NOT NULL,
+                                 etag TEXT,
+                                 last_modified TEXT,
+                                 fetched_at REAL NOT NULL,
+                                 accessed_at REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed_at)")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+                                 url TEXT NOT NULL,
+                                 output_file TEXT NOT NULL,
+                                 etag TEXT,
+                                 last_modified TEXT,
+                                 carousel_hash TEXT,
+                                 checked_at REAL NOT NULL,
+                                 PRIMARY KEY (url, output_file))""")
+        self.conn.commit()
+
+    # The cached record of url (its fields, validators and fetch time), or None
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT publication_date, author, blurb, etag, last_modified, fetched_at FROM articles WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE articles SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        return dict(zip(FIELDS + ("etag", "last_modified", "fetched_at"), row))
+
+    # Whether a cached record can be used as is, without asking the server
+    def is_fresh(self, record):
+        return self.ttl is None or time.time() - record["fetched_at"] < self.ttl
+
+    # Insert or replace the record of url, committed immediately
+    def put(self, url, record):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO articles (url, publication_date, author, blurb, etag, last_modified, fetched_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET
+                       publication_date = excluded.publication_date, author = excluded.author, blurb = excluded.blurb,
+                       etag = excluded.etag, last_modified = excluded.last_modified,
+                       fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at""",
+                (url, record["publication_date"], record["author"], record["blurb"],
+                 record.get("etag"), record.get("last_modified"), now, now))
+            self.conn.commit()
+
+    # The front page state recorded when output_file was last written from url, or None
+    def get_page(self, url, output_file):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, carousel_hash, checked_at FROM pages WHERE url = ? AND output_file = ?",
+                (url, os.path.abspath(output_file))).fetchone()
+        return dict(zip(("etag", "last_modified", "carousel_hash", "checked_at"), row)) if row else None
+
+    def put_page(self, url, output_file, etag, last_modified, carousel_hash):
+        with self.lock:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO pages (url, output_file, etag, last_modified, carousel_hash, checked_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (url, os.path.abspath(output_file), etag, last_modified, carousel_hash, time.time()))
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    # Drop the least recently used entries beyond max_entries; returns how many were dropped
+    def evict(self):
+        if self.max_entries is None:
+            return 0
+        with self.lock:
+            deleted = self.conn.execute(
+                """DELETE FROM articles WHERE url IN (
+                       SELECT url FROM articles ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)""",
+                (self.max_entries,)).rowcount
+            self.conn.commit()
+        return deleted
+
+    # Import the entries of an old cache.json; they have no validators and count as fetched now
+    def import_json(self, json_file):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        for url, details in legacy.items():
+            self.put(url, {field: details.get(field, "") for field in FIELDS})
+        return len(legacy)
+
+    def close(self):
+        self.conn.close()
+
+
+# Open the cache database, importing the old cache.json next to it the first time
+def open_cache(path=CACHE_DB, ttl=None, max_entries=MAX_ENTRIES, legacy_file=LEGACY_CACHE_FILE):
+    is_new = not os.path.exists(path)
+    cache = ArticleCache(path, ttl, max_entries)
+    if is_new and legacy_file and os.path.exists(legacy_file):
+        print(f"Imported {cache.import_json(legacy_file)} cached articles from {legacy_file} into {path}")
+    return cache
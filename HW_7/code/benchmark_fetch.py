@@ -0,0 +1,44 @@
+import time
+import argparse
+from collect_trending import make_session, fetch_trending_stories_page, extract_trending_story_links, fetch_articles
+from stub_server import start_stub_server
+
+# Time fetching every article of a fixture carousel, sequentially and concurrently, against
+# the local stub server. The cache is not involved, so every run fetches every article.
+
+
+def time_fetch(url, workers, per_host, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        session = make_session(max(workers, per_host))
+        page = fetch_trending_stories_page(url, session)
+        story_links, _ = extract_trending_story_links(page, url)
+        details = fetch_articles(story_links, session, workers, per_host)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, details
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent article fetching on a local stub server")
+    parser.add_argument('-n', '--articles', type=int, default=100, help='Number of stories in the fixture carousel')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds of simulated delay per response')
+    parser.add_argument('-w', '--workers', type=int, nargs='+', default=[1, 4, 8, 16], help='Worker counts to time')
+    parser.add_argument('--per-host', type=int, default=16, help='Most concurrent requests to the stub server')
+    parser.add_argument('-r', '--repeats', type=int, default=3, help='Runs per worker count (the best is reported)')
+
+    args = parser.parse_args()
+    server, url = start_stub_server(args.articles, args.latency)
+
+    baseline = baseline_details = None
+    for workers in args.workers:
+        seconds, details = time_fetch(url, workers, args.per_host, args.repeats)
+        if baseline is None:
+            baseline, baseline_details = seconds, details
+        same = "same results" if details == baseline_details else "RESULTS DIFFER"
+        print(f"{workers:>3} workers: {seconds:.3f} s ({baseline / seconds:.1f}x, {same})")
+
+    server.shutdown()
+
+# Run this script with python3 benchmark_fetch.py -n 100 --latency 0.05 -w 1 8 16
@@ -0,0 +1,82 @@
+import os
+import time
+import argparse
+from page_parsers import PARSERS, get_parser
+from collect_trending import extract_trending_story_links, NEWS_URL
+from stub_server import front_page_html, article_page_html
+
+# Time every HTML extraction engine on saved pages: front pages (with the trending carousel)
+# and article pages. Results are checked against the default engine.
+
+
+# Saved pages from a directory (e.g. fetched with curl), sorted into front and article pages
+def load_pages(pages_dir):
+    front_pages, article_pages = [], []
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(pages_dir, name), 'r', encoding='utf-8') as f:
+                html = f.read()
+            (front_pages if 'data-carousel-item' in html else article_pages).append(html)
+    return front_pages, article_pages
+
+
+# Fixture pages like the stub server's, optionally written to save_dir for later runs
+def fixture_pages(articles, filler, save_dir=None):
+    front_pages = [front_page_html(articles, filler)]
+    article_pages = [article_page_html(i, filler) for i in range(articles)]
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+        for name, html in [("front.html", front_pages[0])] + [(f"article_{i}.html", html) for i, html in enumerate(article_pages)]:
+            with open(os.path.join(save_dir, name), 'w', encoding='utf-8') as f:
+                f.write(html)
+    return front_pages, article_pages
+
+
+# Best time per page over repeats, and the extracted results
+def time_pages(func, pages, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = [func(html) for html in pages]
+        elapsed = (time.perf_counter() - start) / max(1, len(pages))
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the HTML extraction engines of collect_trending.py on saved pages")
+    parser.add_argument('--pages', type=str, help='Directory of saved .html pages (default: generated fixture pages)')
+    parser.add_argument('--save', type=str, help='Also write the generated fixture pages to this directory')
+    parser.add_argument('-n', '--articles', type=int, default=20, help='Number of fixture articles (and carousel stories)')
+    parser.add_argument('--filler', type=int, default=200, help='Blocks of page furniture (about 1 KB each) around the fixture content')
+    parser.add_argument('-r', '--repeats', type=int, default=3, help='Runs per engine (the best is reported)')
+    parser.add_argument('--parsers', nargs='+', choices=sorted(PARSERS), default=list(PARSERS), help='Engines to time')
+
+    args = parser.parse_args()
+    if args.pages:
+        front_pages, article_pages = load_pages(args.pages)
+    else:
+        front_pages, article_pages = fixture_pages(args.articles, args.filler, args.save)
+    print(f"{len(front_pages)} front pages, {len(article_pages)} article pages")
+
+    expected = None
+    for name in args.parsers:
+        try:
+            engine = get_parser(name)
+        except ImportError as error:
+            print(f"{name:<22} skipped: {error}")
+            continue
+
+        def front(html):
+            return extract_trending_story_links(engine.front_page(html), NEWS_URL, engine)
+
+        front_seconds, links = time_pages(front, front_pages, args.repeats)
+        article_seconds, details = time_pages(engine.article_details, article_pages, args.repeats)
+        if expected is None:
+            expected = (links, details)  # The first engine (the default one, unless left out) is the reference
+            same = "reference"
+        else:
+            same = "same results" if (links, details) == expected else "RESULTS DIFFER"
+        print(f"{name:<22} front page {front_seconds * 1000:8.2f} ms   article page {article_seconds * 1000:8.2f} ms   ({same})")
+
+# Run this script with python3 benchmark_parsers.py -n 20 --filler 200, or on saved pages with --pages saved_pages/
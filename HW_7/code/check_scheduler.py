@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from stub_server import start_stub_server
+from schedule_trending import load_config
+
+# End-to-end check of schedule_trending.py against two local stub servers, reached under two
+# different host names so each gets its own rate limit: --once rounds write each output, a
+# changed carousel appends a record, an unchanged one does not, the rate limit holds (also for
+# the retries of requests refused with 429), and malformed configs are rejected with ValueError.
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule_trending.py')
+
+
+# Run one --once round of the scheduler in its own process, like a cron job would
+def run_once(config_file):
+    result = subprocess.run([sys.executable, SCRIPT, '-c', config_file, '--once'], capture_output=True, text=True)
+    assert result.returncode == 0, f"schedule_trending.py failed:\n{result.stdout}{result.stderr}"
+    return result.stdout
+
+
+def count_records(output_file):
+    with open(output_file, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip())
+
+
+# Most requests served within any window of the given seconds
+def busiest_window(times, seconds=1.0):
+    times = sorted(times)
+    start = 0
+    busiest = 0
+    for end, now in enumerate(times):
+        while now - times[start] >= seconds:
+            start += 1
+        busiest = max(busiest, end - start + 1)
+    return busiest
+
+
+def write_config(path, config):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return path
+
+
+# Every malformed config must fail to load with ValueError, not another exception
+def check_bad_configs(tmp_dir, good_source):
+    bad_configs = {
+        "rate limit without rate": {"sources": [good_source], "rate_limits": {"127.0.0.1": {"burst": 2}}},
+        "zero rate": {"sources": [good_source], "rate_limits": {"127.0.0.1": {"rate": 0}}},
+        "zero burst": {"sources": [good_source], "default_rate_limit": {"rate": 1, "burst": 0}},
+        "string rate": {"sources": [good_source], "default_rate_limit": {"rate": "fast"}},
+        "string source": {"sources": ["http://127.0.0.1/category/news/"]},
+        "sources not a list": {"sources": good_source},
+        "zero interval": {"sources": [dict(good_source, interval=0)]},
+        "zero workers": {"sources": [dict(good_source, workers=0)]},
+        "duplicate output": {"sources": [good_source, dict(good_source, name="copy")]},
+        "unknown profile": {"sources": [dict(good_source, profile="no-such-engine")]},
+        "no sources": {"sources": []},
+    }
+    for problem, config in bad_configs.items():
+        config_file = write_config(os.path.join(tmp_dir, 'bad.json'), config)
+        try:
+            load_config(config_file)
+        except ValueError as error:
+            print(f"Rejected {problem}: {error}")
+        else:
+            raise AssertionError(f"Config with {problem} was accepted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check schedule_trending.py end to end against local stub servers")
+    parser.add_argument('--rate', type=float, default=5, help='Requests per second allowed to the first host')
+    parser.add_argument('--burst', type=int, default=2, help='Burst allowed to the first host')
+    parser.add_argument('-n', '--articles', type=int, default=5, help='Stories in each stub carousel at the start')
+
+    args = parser.parse_args()
+
+    server_a, url_a = start_stub_server(args.articles, latency=0.01)
+    server_b, _ = start_stub_server(args.articles, latency=0.01)
+    url_b = f'http://localhost:{server_b.server_address[1]}/category/sports/'
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_a, output_b = os.path.join(tmp_dir, 'a.jsonl'), os.path.join(tmp_dir, 'b.jsonl')
+            config_file = write_config(os.path.join(tmp_dir, 'sources.json'), {
+                "cache": os.path.join(tmp_dir, 'cache.db'),
+                "rate_limits": {"127.0.0.1": {"rate": args.rate, "burst": args.burst}},
+                "default_rate_limit": {"rate": 50, "burst": 10},
+                "sources": [{"name": "a", "url": url_a, "output": output_a, "workers": 4},
+                            {"name": "b", "url": url_b, "output": output_b, "workers": 4}],
+            })
+
+            # First round: both outputs are written
+            run_once(config_file)
+            assert count_records(output_a) == 1 and count_records(output_b) == 1, "First round did not write both outputs"
+            print("First --once round wrote both outputs")
+
+            # Nothing changed: no new records
+            run_once(config_file)
+            assert count_records(output_a) == 1 and count_records(output_b) == 1, "Unchanged pages appended records"
+            print("Unchanged pages appended nothing")
+
+            # A carousel change on one host appends a record to its output only, and the new
+            # stories it brings are fetched within that host's rate limit
+            server_a.articles += 4 * int(args.rate)
+            server_a.statuses.clear()
+            run_once(config_file)
+            assert count_records(output_a) == 2 and count_records(output_b) == 1, "Carousel change was not appended"
+            print("Carousel change appended one record")
+
+            busiest = busiest_window([when for _, _, when in server_a.statuses])
+            allowed = args.burst + args.rate
+            print(f"{len(server_a.statuses)} requests to the rate limited host, at most {busiest} in any second (allowed {allowed:g})")
+            assert busiest <= allowed, "Rate limit was exceeded"
+
+            # A host answering 429 is retried, and every retry waits for the rate limit too
+            server_a.throttle = 1
+            server_a.articles += 2 * int(args.rate)
+            server_a.statuses.clear()
+            run_once(config_file)
+            assert count_records(output_a) == 3, "Carousel change behind 429 responses was not appended"
+            refused = sum(1 for _, status, _ in server_a.statuses if status == 429)
+            busiest = busiest_window([when for _, _, when in server_a.statuses])
+            print(f"{len(server_a.statuses)} requests to the throttled host ({refused} refused with 429), at most {busiest} in any second (allowed {allowed:g})")
+            assert refused > 0, "The stub server refused no requests"
+            assert busiest <= allowed, "Retries after 429 exceeded the rate limit"
+
+            check_bad_configs(tmp_dir, {"name": "a", "url": url_a, "output": output_a})
+    finally:
+        server_a.shutdown()
+        server_b.shutdown()
+
+    print("All scheduler checks passed")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run this script with python3 check_scheduler.py
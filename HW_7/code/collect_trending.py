@@ -1,8 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
 import json
+import time
+import hashlib
 import argparse
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+from article_cache import open_cache, CACHE_DB, MAX_ENTRIES
+from page_parsers import get_parser, PARSERS, DEFAULT_PARSER
+from rate_limit import RateLimitedAdapter, RETRY_STATUSES, RETRY_METHODS
 
 # Define headers to serve as a browser request from a user
 headers = {
@@ -11,127 +20,164 @@ headers = {
     'Referer': 'https://montrealgazette.com/'
 }
 
-CACHE_FILE = 'cache.json'  # Cache file to store visited URLs and their data
+NEWS_URL = "https://montrealgazette.com/category/news/"  # Default page to collect the trending carousel from
+TIMEOUT = 10  # Seconds to wait for a server to respond before giving up on a request
+RETRIES = 3  # Extra attempts for a failed connection or a 429/5xx response, with exponential backoff
+PER_HOST = 4  # Most requests in flight to any one site at a time, to stay polite
+
+# Create one keep-alive session for all requests, so article fetches reuse pooled connections
+# instead of opening a new one each time, and retry transient failures with backoff. With a
+# DomainRateLimiter, every request (and every retry) first waits for its domain's rate limit.
+def make_session(pool_size=PER_HOST, retries=RETRIES, backoff=0.5, limiter=None):
+    session = requests.Session()
+    session.headers.update(headers)
+    if limiter:
+        # Retried above the limiter, so each attempt waits for a token
+        adapter = RateLimitedAdapter(limiter, retries, backoff, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset(RETRY_METHODS), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Caps how many requests are in flight to each host, whatever the total number of workers
+class HostLimiter:
+    def __init__(self, per_host=PER_HOST):
+        self.per_host = per_host
+        self.semaphores = {}
+        self.lock = threading.Lock()
 
-# Load the cache from the makeshift cache file
-def load_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f) # We already have a JSON cache so turn it into its a readable dictionary
-    return {} # Make an empty dictionary mapping URLs visited to the JSONs that we got from scraping those articles
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
 
-# Save the cache that we ended up with this time around as the new cache file
-def save_cache(cache): # It will still be a dictionary of URL -> JSON structure
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cache, f, ensure_ascii=False, indent=4) # write as a to-JSON type
+# Request headers that turn a GET into a conditional one, from the ETag/Last-Modified we saved
+def conditional_headers(validators):
+    request_headers = {}
+    if validators and validators.get("etag"):
+        request_headers['If-None-Match'] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        request_headers['If-Modified-Since'] = validators["last_modified"]
+    return request_headers
 
-# Function to fetch and parse the Montreal Gazette News page
-def fetch_trending_stories_page(url):
-    response = requests.get(url, headers=headers)
+# Function to request the news page, conditionally if we have its validators from the last run.
+# Returns the response (status 304 if the page has not changed), or None if the request failed.
+# request_headers are sent on top of the session's, e.g. a source's own Referer.
+def request_front_page(url, session=None, timeout=TIMEOUT, validators=None, request_headers=None):
+    session = session or make_session()
+    try:
+        return session.get(url, timeout=timeout, headers={**(request_headers or {}), **conditional_headers(validators)})
+    except requests.RequestException as error:
+        print(f"Failed to retrieve the page: {error}")
+        return None
+
+# Hash of the trending carousel's markup, from the first carousel item to the end of the last,
+# found with plain string searches so an unchanged carousel is detected without parsing the
+# page. marker is the attribute that tags carousel items. None if the page has no carousel.
+def carousel_hash(html, marker='data-carousel-item'):
+    first = html.find(marker) if marker else -1
+    if first == -1:
+        return None
+    start = html.rfind('<li', 0, first)
+    end = html.find('</li>', html.rfind(marker))
+    fragment = html[max(start, 0):len(html) if end == -1 else end + len('</li>')]
+    return hashlib.sha256(fragment.encode('utf-8')).hexdigest()
+
+# Function to fetch and parse the Montreal Gazette News page, with the given extraction engine
+def fetch_trending_stories_page(url, session=None, timeout=TIMEOUT, parser=None):
+    parser = parser or get_parser()
+    response = request_front_page(url, session, timeout)
+    if response is None:
+        return None
     if response.status_code == 200:
-        return BeautifulSoup(response.text, 'html.parser')
+        return parser.front_page(response.text)
     else:
         print(f"Failed to retrieve the page, status code: {response.status_code}")
         return None
 
-# Function to extract trending story links from the soup
-def extract_trending_story_links(soup):
+# Function to extract trending story links from the parsed page, resolved against the page's URL
+def extract_trending_story_links(page, page_url=NEWS_URL, parser=None):
+    parser = parser or get_parser()
     story_links = []
+    seen = set()  # Same links as story_links, for constant-time duplicate checks
     articles_data = []
 
-    # Find the trending stories by navigating the carousel under the nav bar
-    trending_stories_carousel = soup.find_all('li', {'data-carousel-item': True})
-
-    # We'll find the link within each story section on the page
-    for story in trending_stories_carousel:
-        article = story.find('article', class_='article-card article-card--image-left article-card--hide-padlock')
-        if article:
-            content_div = article.find('div', class_='article-card__content')
-            if content_div:
-                details_div = content_div.find('div', class_='article-card__details')
-                if details_div:
-                    link_tag = details_div.find('a', class_='article-card__link')
-                    if link_tag and 'href' in link_tag.attrs:
-                        story_link = link_tag['href']
-                        full_story_url = "https://montrealgazette.com" + story_link
-                        article_title = link_tag.get('aria-label', 'No title')
-
-                        if full_story_url not in story_links:
-                            story_links.append(full_story_url)
-                            articles_data.append({
-                                "title": article_title,
-                                "publication_date": "",  # Placeholder for now
-                                "author": "",            # Placeholder for now
-                                "blurb": ""              # Placeholder for now
-                            })
+    # The engine finds the link and title within each story of the carousel, in page order
+    for story_link, article_title in parser.story_links(page):
+        full_story_url = urljoin(page_url, story_link)
+
+        if full_story_url not in seen:
+            seen.add(full_story_url)
+            story_links.append(full_story_url)
+            articles_data.append({
+                "title": article_title,
+                "publication_date": "",  # Placeholder for now
+                "author": "",            # Placeholder for now
+                "blurb": ""              # Placeholder for now
+            })
 
     return story_links, articles_data
 
-# Function to visit each article page and extract the publication date, author, and blurb
-def fetch_article_details(article_url):
-    response = requests.get(article_url, headers=headers)
+# Function to extract the publication date, author, and blurb from an article page
+def parse_article_details(html, parser=None):
+    return (parser or get_parser()).article_details(html)
+
+# Function to visit an article page and return its cache record: the publication date, author
+# and blurb, plus the server's ETag/Last-Modified validators. With a cached record the request
+# is conditional, and a 304 Not Modified reuses the cached details without re-parsing.
+# Returns None if the article could not be retrieved.
+def fetch_article_details(article_url, session=None, timeout=TIMEOUT, cached=None, parser=None, request_headers=None):
+    session = session or make_session()
+    try:
+        response = session.get(article_url, timeout=timeout, headers={**(request_headers or {}), **conditional_headers(cached)})
+    except requests.RequestException as error:
+        print(f"Failed to retrieve {article_url}: {error}")
+        return None
+    if response.status_code == 304 and cached:
+        return {field: cached[field] for field in ("publication_date", "author", "blurb", "etag", "last_modified")}
     if response.status_code == 200:
-        article_soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Extract the publication date
-        pub_date = article_soup.find('span', class_='published-date__since')
-        publication_date = pub_date.get_text().replace('Published ', '').strip() if pub_date else ""
-
-        # Extract the author name from either regular or wire-published structures
-        author = ""
-
-        # Check for regular published author
-        author_section = article_soup.find('span', class_='published-by__author')
-        if author_section:
-            author_link = author_section.find('a')
-            if author_link:
-                author = author_link.get_text().strip()
-
-        # Check for wire-published author if regular author was not found
-        if not author:
-            wire_author_section = article_soup.find('div', class_='wire-published-by__authors')
-            if wire_author_section:
-                author = wire_author_section.get_text().strip()
-
-        # Extract the blurb (subtitle)
-        blurb_section = article_soup.find('p', class_='article-subtitle')
-        blurb = blurb_section.get_text().strip() if blurb_section else ""
-
-        return publication_date, author, blurb
-    return "", "", ""
-
-# Main function to scrape trending stories and write to the output file
-def scrape_trending_stories(url, output_file, cache):
-    # Fetch the main page
-    soup = fetch_trending_stories_page(url)
-    if not soup:
-        return
+        publication_date, author, blurb = parse_article_details(response.text, parser)
+        return {"publication_date": publication_date, "author": author, "blurb": blurb,
+                "etag": response.headers.get('ETag'), "last_modified": response.headers.get('Last-Modified')}
+    print(f"Failed to retrieve {article_url}, status code: {response.status_code}")
+    return None
 
-    # Extract trending story links and prepare the article data
-    story_links, articles_data = extract_trending_story_links(soup)
+# Fetch the details of every article, up to `workers` at a time over one shared session and at
+# most per_host at a time to the same site. Results come back in the same order as the URLs.
+# cached holds each URL's cached record to revalidate (or None), and on_result(url, record) is
+# called as soon as each article finishes, e.g. to store it in the cache right away.
+def fetch_articles(article_urls, session=None, workers=1, per_host=PER_HOST, timeout=TIMEOUT, cached=None, on_result=None,
+                   parser=None, request_headers=None):
+    session = session or make_session(max(workers, per_host))
+    parser = parser or get_parser()
+    limit = HostLimiter(per_host)
+    cached = cached or [None] * len(article_urls)
 
-    # Visit each story and update the JSON structure with the publication date
-    for i, story_link in enumerate(story_links):
-        # Check if article URL is in cache, note that having an entire URL as a key though messy, but reasonable here
-        if story_link in cache:
-            print(f"Using cached data for {story_link}") # Found a match so can reuse our scraped data
-            articles_data[i]["publication_date"] = cache[story_link]["publication_date"]
-            articles_data[i]["author"] = cache[story_link]["author"]
-            articles_data[i]["blurb"] = cache[story_link]["blurb"]
-            # This saves unnecessary load on the website, rather than having to scrape this article page
-        else: # Actually need to scrape using our helper function
-            publication_date, author, blurb = fetch_article_details(story_link)
-            articles_data[i]["publication_date"] = publication_date
-            articles_data[i]["author"] = author
-            articles_data[i]["blurb"] = blurb
-
-            # Cache the result, for which we don't care about the article title, since
-            # We would have found that in the main page anyways
-            cache[story_link] = {
-                "publication_date": publication_date,
-                "author": author,
-                "blurb": blurb
-            }
+    def fetch(article_url, cached_record):
+        with limit(article_url):
+            record = fetch_article_details(article_url, session, timeout, cached_record, parser, request_headers)
+        if on_result:
+            on_result(article_url, record)
+        return record
+
+    if workers <= 1:
+        return [fetch(article_url, cached_record) for article_url, cached_record in zip(article_urls, cached)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fetch, article_urls, cached))  # map keeps the input order
+
+# Write the articles to output_file: a JSON array, or for a .jsonl output one more line (with the
+# poll time) appended to the stream, so a long-running poller keeps every change
+def write_articles(articles_data, output_file):
+    if output_file.endswith('.jsonl'):
+        record = {"polled_at": time.strftime('%Y-%m-%dT%H:%M:%S%z'), "articles": articles_data}
+        with open(output_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
 
     # Turn our list of dictionaries into a JSON output
     articles_json = json.dumps(articles_data, ensure_ascii=False, indent=4)
@@ -140,28 +186,122 @@ def scrape_trending_stories(url, output_file, cache):
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(articles_json)
 
+# Main function to scrape trending stories and write to the output file. Unless force is set, a
+# run stops early when the front page (or just its carousel) is the same as when output_file was
+# last written. Returns True if the output was written, False if it was left as is, and None if
+# the front page could not be retrieved. A long-running caller can pass its own session and
+# extraction engine to share them between pages, and request_headers for this page's site.
+def scrape_trending_stories(url, output_file, cache, workers=1, per_host=PER_HOST, timeout=TIMEOUT, retries=RETRIES,
+                            parser_name=DEFAULT_PARSER, force=False, session=None, parser=None, request_headers=None):
+    # One pooled session and one extraction engine for the page and all its articles
+    session = session or make_session(max(workers, per_host), retries)
+    parser = parser or get_parser(parser_name)
+
+    # Fetch the main page, conditionally if its state was recorded when the output was last written
+    page_state = None if force or not os.path.exists(output_file) else cache.get_page(url, output_file)
+    response = request_front_page(url, session, timeout, page_state, request_headers)
+    if response is None:
+        return None
+    if response.status_code == 304 and page_state:
+        print(f"Front page not modified since {output_file} was written, nothing to do")
+        cache.put_page(url, output_file, page_state["etag"], page_state["last_modified"], page_state["carousel_hash"])
+        return False
+    if response.status_code != 200:
+        print(f"Failed to retrieve the page, status code: {response.status_code}")
+        return None
+
+    # The page changed, but maybe not its carousel: compare hashes before parsing anything
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    page_hash = carousel_hash(response.text, parser.carousel_marker)
+    if page_state and page_hash is not None and page_hash == page_state["carousel_hash"]:
+        print(f"Trending carousel unchanged since {output_file} was written, nothing to do")
+        cache.put_page(url, output_file, etag, last_modified, page_hash)
+        return False
+    page = parser.front_page(response.text)
+
+    # Extract trending story links and prepare the article data
+    story_links, articles_data = extract_trending_story_links(page, url, parser)
+
+    # Check if article URL is in cache, note that having an entire URL as a key though messy, but reasonable here
+    to_fetch = []
+    cached = {}
+    for i, story_link in enumerate(story_links):
+        record = cache.get(story_link)
+        if record and cache.is_fresh(record):
+            print(f"Using cached data for {story_link}") # Found a match so can reuse our scraped data
+            for field in ("publication_date", "author", "blurb"):
+                articles_data[i][field] = record[field]
+            # This saves unnecessary load on the website, rather than having to scrape this article page
+        else: # Actually need to scrape using our helper function (conditionally, if it is cached but expired)
+            to_fetch.append(i)
+            cached[i] = record
+
+    # Cache each result as soon as it arrives, for which we don't care about the article title,
+    # since we would have found that in the main page anyways
+    def store(story_link, record):
+        if record is not None:
+            cache.put(story_link, record)
+
+    # Visit the uncached stories (concurrently with workers > 1) and update the JSON structure
+    records = fetch_articles([story_links[i] for i in to_fetch], session, workers, per_host, timeout,
+                             [cached[i] for i in to_fetch], store, parser, request_headers)
+    failed = 0  # Articles written with empty fields, neither fetched nor cached
+    for i, record in zip(to_fetch, records):
+        record = record or cached[i]  # Fall back to the stale cached copy if the fetch failed
+        if not record:
+            failed += 1
+        for field in ("publication_date", "author", "blurb"):
+            articles_data[i][field] = record[field] if record else ""
+
+    write_articles(articles_data, output_file)
     print(f"Successfully written to {output_file}")
 
-    # Save cache after scraping this time around
-    save_cache(cache)
+    # Record the front page the output was written from, for the next run's change detection.
+    # If some articles failed, record it without validators or carousel hash, so the next run
+    # fetches and parses the page in full and retries them
+    if failed:
+        print(f"{failed} articles could not be fetched, they will be retried on the next run")
+        cache.put_page(url, output_file, None, None, None)
+    else:
+        cache.put_page(url, output_file, etag, last_modified, page_hash)
+
+    # Keep the cache bounded, dropping the least recently used articles
+    evicted = cache.evict()
+    if evicted:
+        print(f"Evicted {evicted} least recently used articles from the cache")
+    return True
 
 # Setup argparse to handle command-line arguments
 def main():
     parser = argparse.ArgumentParser(description="Scrape trending articles from Montreal Gazette")
     parser.add_argument('-o', '--output', type=str, required=True, help='Output file to save the JSON data')
-    
+    parser.add_argument('-u', '--url', type=str, default=NEWS_URL, help='Page with the trending carousel (default: the Montreal Gazette News page)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of articles to fetch concurrently')
+    parser.add_argument('--per-host', type=int, default=PER_HOST, help='Most concurrent requests to the same site')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='Seconds to wait for each response')
+    parser.add_argument('--retries', type=int, default=RETRIES, help='Retries with exponential backoff for failed requests')
+    parser.add_argument('--cache', type=str, default=CACHE_DB, help='SQLite cache of scraped articles (an old cache.json is imported into a new one)')
+    parser.add_argument('--ttl-hours', type=float, help='Revalidate cached articles older than this with a conditional request (default: never)')
+    parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES, help='Most articles kept in the cache, least recently used are evicted first')
+    parser.add_argument('--parser', choices=sorted(PARSERS), default=DEFAULT_PARSER, help='HTML extraction engine (the lxml ones need lxml installed)')
+    parser.add_argument('--force', action='store_true', help='Scrape and rewrite the output even if the front page has not changed since the last run')
+
     args = parser.parse_args()
 
-    # Load the cache
-    cache = load_cache()
-    
-    # URL of the Montreal Gazette News page
-    news_url = "https://montrealgazette.com/category/news/"
-    
+    # Open the cache
+    ttl = args.ttl_hours * 3600 if args.ttl_hours is not None else None
+    cache = open_cache(args.cache, ttl, args.max_entries)
+
     # Scrape the trending stories and write to the specified output file
-    scrape_trending_stories(news_url, args.output, cache)
+    try:
+        scrape_trending_stories(args.url, args.output, cache, args.workers, args.per_host, args.timeout, args.retries,
+                                args.parser, args.force)
+    finally:
+        cache.close()
 
 if __name__ == "__main__":
     main()
 
-# Run this script with python3 collect_trending.py -o trending.json
\ No newline at end of file
+# Run this script with python3 collect_trending.py -o trending.json
+# Or fetch the articles 8 at a time: python3 collect_trending.py -o trending.json -w 8
+# Or parse with lxml and compiled XPath: python3 collect_trending.py -o trending.json --parser lxml-xpath
\ No newline at end of file
@@ -0,0 +1,273 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import soupsieve
+except ImportError:  # Only the CSS selector engines need it (it is installed along with bs4)
+    soupsieve = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # Only the lxml engines need it
+    lxml = None
+
+# Pluggable extraction engines for the news page carousel and the article bylines. Every engine
+# finds the same elements as the original nested BeautifulSoup find calls; they differ in the
+# tree builder, in how much of the page they build, and in how they look the elements up.
+
+DEFAULT_PARSER = 'html.parser'
+
+# The exact class attribute of a carousel article card, as the original find call matches it
+CARD_CLASS = 'article-card article-card--image-left article-card--hide-padlock'
+
+# Class names of the article page elements we read; a strainer only builds these subtrees
+ARTICLE_CLASSES = ['published-date__since', 'published-by__author', 'wire-published-by__authors', 'article-subtitle']
+
+
+def require_lxml():
+    if lxml is None:
+        raise ImportError("This parser requires lxml (pip install lxml), or use --parser html.parser")
+
+
+# BeautifulSoup extraction. features is the tree builder ('html.parser' or 'lxml'); strain only
+# builds the carousel items or byline elements instead of the whole page; css looks them up
+# with selectors compiled once instead of the nested find calls.
+class SoupParser:
+    carousel_marker = 'data-carousel-item'  # Tags the carousel items in the raw page, see carousel_hash
+
+    def __init__(self, features='html.parser', strain=False, css=False):
+        if features == 'lxml':
+            require_lxml()
+        if css and soupsieve is None:
+            raise ImportError("CSS selectors require soupsieve (pip install soupsieve)")
+        self.features = features
+        self.front_page_strainer = SoupStrainer('li', attrs={'data-carousel-item': True}) if strain else None
+        self.article_strainer = SoupStrainer(class_=ARTICLE_CLASSES) if strain else None
+        if css:
+            # One selector per step of the find chain, so each step still takes the first match
+            self.card_steps = [soupsieve.compile(f'article[class="{CARD_CLASS}"]'),
+                               soupsieve.compile('div.article-card__content'),
+                               soupsieve.compile('div.article-card__details'),
+                               soupsieve.compile('a.article-card__link')]
+            self.carousel_items = soupsieve.compile('li[data-carousel-item]')
+            self.pub_date = soupsieve.compile('span.published-date__since')
+            self.author_link = soupsieve.compile('span.published-by__author a')
+            self.author_section = soupsieve.compile('span.published-by__author')
+            self.wire_author = soupsieve.compile('div.wire-published-by__authors')
+            self.blurb = soupsieve.compile('p.article-subtitle')
+        self.css = css
+
+    def front_page(self, html):
+        return BeautifulSoup(html, self.features, parse_only=self.front_page_strainer)
+
+    # (href, title) of every carousel story, in page order
+    def story_links(self, soup):
+        if self.css:
+            for story in self.carousel_items.select(soup):
+                tag = story
+                for step in self.card_steps:
+                    tag = step.select_one(tag)
+                    if tag is None:
+                        break
+                if tag is not None and 'href' in tag.attrs:
+                    yield tag['href'], tag.get('aria-label', 'No title')
+            return
+
+        # Find the trending stories by navigating the carousel under the nav bar
+        trending_stories_carousel = soup.find_all('li', {'data-carousel-item': True})
+
+        # We'll find the link within each story section on the page
+        for story in trending_stories_carousel:
+            article = story.find('article', class_=CARD_CLASS)
+            if article:
+                content_div = article.find('div', class_='article-card__content')
+                if content_div:
+                    details_div = content_div.find('div', class_='article-card__details')
+                    if details_div:
+                        link_tag = details_div.find('a', class_='article-card__link')
+                        if link_tag and 'href' in link_tag.attrs:
+                            yield link_tag['href'], link_tag.get('aria-label', 'No title')
+
+    # (publication_date, author, blurb) of an article page
+    def article_details(self, html):
+        article_soup = BeautifulSoup(html, self.features, parse_only=self.article_strainer)
+
+        if self.css:
+            pub_date = self.pub_date.select_one(article_soup)
+            author_section = self.author_section.select_one(article_soup)
+            author_link = self.author_link.select_one(author_section) if author_section else None
+            wire_author_section = self.wire_author.select_one(article_soup)
+            blurb_section = self.blurb.select_one(article_soup)
+        else:
+            pub_date = article_soup.find('span', class_='published-date__since')
+            author_section = article_soup.find('span', class_='published-by__author')
+            author_link = author_section.find('a') if author_section else None
+            wire_author_section = article_soup.find('div', class_='wire-published-by__authors')
+            blurb_section = article_soup.find('p', class_='article-subtitle')
+
+        # Extract the publication date
+        publication_date = pub_date.get_text().replace('Published ', '').strip() if pub_date else ""
+
+        # Extract the author name from either regular or wire-published structures, preferring the regular one
+        author = author_link.get_text().strip() if author_link else ""
+        if not author and wire_author_section:
+            author = wire_author_section.get_text().strip()
+
+        # Extract the blurb (subtitle)
+        blurb = blurb_section.get_text().strip() if blurb_section else ""
+
+        return publication_date, author, blurb
+
+
+def has_class(name):
+    # XPath test for one class among the space-separated ones, like BeautifulSoup's class_
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# lxml without BeautifulSoup: the page is parsed by libxml2 and the elements are found with
+# XPath expressions compiled once. Fastest, but needs lxml.
+class XPathParser:
+    carousel_marker = 'data-carousel-item'
+
+    def __init__(self):
+        require_lxml()
+        self.carousel_items = etree.XPath('//li[@data-carousel-item]')
+        self.card_steps = [etree.XPath(f'(.//article[@class="{CARD_CLASS}"])[1]'),
+                           etree.XPath(f'(.//div[{has_class("article-card__content")}])[1]'),
+                           etree.XPath(f'(.//div[{has_class("article-card__details")}])[1]'),
+                           etree.XPath(f'(.//a[{has_class("article-card__link")}])[1]')]
+        self.pub_date = etree.XPath(f'(//span[{has_class("published-date__since")}])[1]')
+        self.author_section = etree.XPath(f'(//span[{has_class("published-by__author")}])[1]')
+        self.author_link = etree.XPath('(.//a)[1]')
+        self.wire_author = etree.XPath(f'(//div[{has_class("wire-published-by__authors")}])[1]')
+        self.blurb = etree.XPath(f'(//p[{has_class("article-subtitle")}])[1]')
+
+    def parse(self, html):
+        # lxml refuses str input with an XML encoding declaration, so hand it UTF-8 bytes
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+    def front_page(self, html):
+        return self.parse(html)
+
+    def first(self, xpath, node):
+        found = xpath(node)
+        return found[0] if found else None
+
+    def story_links(self, document):
+        for story in self.carousel_items(document):
+            tag = story
+            for step in self.card_steps:
+                tag = self.first(step, tag)
+                if tag is None:
+                    break
+            if tag is not None and tag.get('href') is not None:
+                yield tag.get('href'), tag.get('aria-label', 'No title')
+
+    def article_details(self, html):
+        document = self.parse(html)
+
+        pub_date = self.first(self.pub_date, document)
+        publication_date = pub_date.text_content().replace('Published ', '').strip() if pub_date is not None else ""
+
+        author = ""
+        author_section = self.first(self.author_section, document)
+        author_link = self.first(self.author_link, author_section) if author_section is not None else None
+        if author_link is not None:
+            author = author_link.text_content().strip()
+        if not author:
+            wire_author_section = self.first(self.wire_author, document)
+            if wire_author_section is not None:
+                author = wire_author_section.text_content().strip()
+
+        blurb_section = self.first(self.blurb, document)
+        blurb = blurb_section.text_content().strip() if blurb_section is not None else ""
+
+        return publication_date, author, blurb
+
+
+# Extraction driven by an outlet's profile of CSS selectors, for sites laid out differently from
+# the Gazette. Profile keys:
+#   carousel_item     selector of each trending story (required)
+#   link              selector of the story link within an item (required)
+#   title_attr        link attribute holding the title (default aria-label, else the link text)
+#   publication_date  selector of the date on an article page, date_prefix is stripped from it
+#   author            selector, or list of selectors tried in order, of the author
+#   blurb             selector of the subtitle
+#   features          tree builder, 'html.parser' (default) or 'lxml'
+#   carousel_marker   text that tags carousel items in the raw page, for change detection
+class SelectorParser:
+    def __init__(self, profile):
+        for key in ('carousel_item', 'link'):
+            if key not in profile:
+                raise ValueError(f"Extractor profile is missing '{key}'")
+        if soupsieve is None:
+            raise ImportError("Selector profiles require soupsieve (pip install soupsieve)")
+        self.features = profile.get('features', 'html.parser')
+        if self.features == 'lxml':
+            require_lxml()
+
+        def compile_optional(key):
+            return soupsieve.compile(profile[key]) if profile.get(key) else None
+
+        self.carousel_items = soupsieve.compile(profile['carousel_item'])
+        self.link = soupsieve.compile(profile['link'])
+        self.title_attr = profile.get('title_attr', 'aria-label')
+        self.pub_date = compile_optional('publication_date')
+        authors = profile.get('author') or []
+        self.authors = [soupsieve.compile(selector) for selector in ([authors] if isinstance(authors, str) else authors)]
+        self.blurb = compile_optional('blurb')
+        self.date_prefix = profile.get('date_prefix', 'Published ')
+        self.carousel_marker = profile.get('carousel_marker')
+
+    def front_page(self, html):
+        return BeautifulSoup(html, self.features)
+
+    def story_links(self, soup):
+        for story in self.carousel_items.select(soup):
+            link_tag = self.link.select_one(story)
+            if link_tag is not None and 'href' in link_tag.attrs:
+                yield link_tag['href'], link_tag.get(self.title_attr) or link_tag.get_text().strip() or 'No title'
+
+    def article_details(self, html):
+        article_soup = BeautifulSoup(html, self.features)
+
+        def text_of(selector):
+            tag = selector.select_one(article_soup) if selector else None
+            return tag.get_text().strip() if tag is not None else ""
+
+        publication_date = text_of(self.pub_date)
+        if self.date_prefix:
+            publication_date = publication_date.replace(self.date_prefix, '').strip()
+        author = ""
+        for selector in self.authors:
+            author = text_of(selector)
+            if author:
+                break
+        return publication_date, author, text_of(self.blurb)
+
+
+# Named engines for --parser, from the original (pure-Python html.parser, whole tree, nested
+# find calls) to the fastest (lxml with compiled XPath)
+PARSERS = {
+    'html.parser': lambda: SoupParser('html.parser'),
+    'html.parser-strainer': lambda: SoupParser('html.parser', strain=True, css=True),
+    'lxml': lambda: SoupParser('lxml'),
+    'lxml-strainer': lambda: SoupParser('lxml', strain=True, css=True),
+    'lxml-xpath': XPathParser,
+}
+
+
+def get_parser(name=DEFAULT_PARSER):
+    return PARSERS[name]()
+
+
+# The engine for a scheduler source: the name of a built-in engine, {"engine": name}, or a
+# selector profile (see SelectorParser)
+def get_profile_parser(profile=DEFAULT_PARSER):
+    if isinstance(profile, str):
+        return get_parser(profile)
+    if 'engine' in profile:
+        return get_parser(profile['engine'])
+    return SelectorParser(profile)
@@ -0,0 +1,96 @@
+import time
+import threading
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # Transient responses worth another attempt
+RETRY_METHODS = ("GET", "HEAD")  # Only idempotent requests are retried
+
+# Per-domain request rate limits for a shared requests session: every request, whichever
+# source it is for, first takes a token from its domain's bucket, and so does every retry.
+
+
+# Token bucket: up to `burst` requests at once, refilled at `rate` tokens per second
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"A token bucket needs a rate above 0 and a burst of at least 1, got {rate} and {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Reserve a token and return the seconds to wait before using it (0 if one is available now).
+    # Reserving lets the count go negative, so concurrent callers queue up instead of all waking
+    # at once when the next token arrives.
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# Buckets by domain. A limit set for "example.com" also covers "www.example.com"; any other
+# host gets its own bucket with the default limit (None: unlimited).
+class DomainRateLimiter:
+    def __init__(self, limits=None, default=None):
+        # limits: {domain: (rate, burst)}, default: (rate, burst) or None
+        self.buckets = {domain: TokenBucket(rate, burst) for domain, (rate, burst) in (limits or {}).items()}
+        self.default = default
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        host = (urlsplit(url).hostname or '').lower()
+        parts = host.split('.')
+        for i in range(len(parts)):
+            bucket = self.buckets.get('.'.join(parts[i:]))
+            if bucket:
+                return bucket
+        if self.default is None:
+            return None
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.default)
+            return self.buckets[host]
+
+    def acquire(self, url):
+        bucket = self.bucket(url)
+        return bucket.acquire() if bucket else 0.0
+
+
+# Transport adapter that waits for the request's domain bucket before every attempt. It retries
+# failed connections and 429/5xx responses itself, with the same exponential backoff as urllib3's
+# Retry, instead of leaving retries to urllib3 below send() where they would take no token.
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, limiter, retries=0, backoff=0.5, **kwargs):
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        super().__init__(max_retries=0, **kwargs)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries or request.method not in RETRY_METHODS
+            self.limiter.acquire(request.url)
+            try:
+                response = super().send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                if last:
+                    raise
+            else:
+                if last or response.status_code not in RETRY_STATUSES:
+                    return response
+                response.close()  # Return the connection to the pool before retrying
+            # Like urllib3: retry the first failure at once, then back off exponentially
+            if attempt:
+                time.sleep(self.backoff * 2 ** attempt)
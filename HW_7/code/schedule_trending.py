@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import heapq
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from collect_trending import make_session, scrape_trending_stories, PER_HOST, TIMEOUT, RETRIES
+from article_cache import open_cache, CACHE_DB, MAX_ENTRIES
+from page_parsers import get_profile_parser, DEFAULT_PARSER
+from rate_limit import DomainRateLimiter
+
+# Long-running poller for many trending pages (sections and outlets). Each source is polled on
+# its own interval from a priority queue of next-poll times; all sources share one connection
+# pool, one article cache and per-domain token-bucket rate limits, and each writes its own output.
+#
+# Config (JSON):
+# {
+#     "cache": "cache.db",                            optional, like collect_trending.py --cache
+#     "ttl_hours": 24, "max_entries": 10000,          optional cache settings
+#     "defaults": {"interval": 300, "workers": 4, "profile": "html.parser"},
+#     "rate_limits": {"montrealgazette.com": {"rate": 2, "burst": 4}},   requests per second per domain
+#     "default_rate_limit": {"rate": 1, "burst": 2},                     for any other domain (optional)
+#     "profiles": {"gazette": {"engine": "lxml-xpath"}, "other": {"carousel_item": "...", "link": "..."}},
+#     "sources": [
+#         {"name": "gazette-news", "url": "https://montrealgazette.com/category/news/",
+#          "output": "trending/gazette-news.jsonl", "profile": "gazette", "interval": 120,
+#          "headers": {"Referer": "https://montrealgazette.com/"}}
+#     ]
+# }
+# A source's profile is the name of an entry in "profiles", a built-in --parser engine name, or
+# an inline selector profile (see page_parsers.SelectorParser).
+
+DEFAULT_INTERVAL = 300  # Seconds between polls of a source
+MAX_BACKOFF = 8  # A failing source is retried after up to this many intervals
+
+
+class Source:
+    def __init__(self, name, url, output, parser, interval=DEFAULT_INTERVAL, workers=1, headers=None):
+        self.name = name
+        self.url = url
+        self.output = output
+        self.parser = parser
+        self.interval = interval
+        self.workers = workers
+        self.headers = headers or {}
+        self.failures = 0  # Consecutive failed polls, for backoff
+
+    # Seconds until the next poll after one with the given result
+    def next_delay(self, result):
+        if result is None:
+            self.failures += 1
+            return self.interval * min(2 ** (self.failures - 1), MAX_BACKOFF)
+        self.failures = 0
+        return self.interval
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# (rate, burst) of a {"rate": ..., "burst": ...} limit; raises ValueError unless rate > 0 and burst >= 1
+def parse_rate_limit(limit, where="rate limit"):
+    if not isinstance(limit, dict) or "rate" not in limit:
+        raise ValueError(f"{where} must be an object with a \"rate\", got {limit!r}")
+    rate, burst = limit["rate"], limit.get("burst", 1)
+    if not is_number(rate) or rate <= 0:
+        raise ValueError(f"{where} rate must be a number above 0, got {rate!r}")
+    if not is_number(burst) or burst < 1 or burst != int(burst):
+        raise ValueError(f"{where} burst must be a whole number of at least 1, got {burst!r}")
+    return float(rate), int(burst)
+
+
+# An optional JSON object from the config, {} if it is missing
+def get_object(config, key, where):
+    value = config.get(key, {})
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} \"{key}\" must be an object, got {value!r}")
+    return value
+
+
+# Sources, rate limiter and settings from a config file; raises ValueError if it is malformed
+def load_config(config_file):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{config_file} must hold a JSON object")
+
+    defaults = get_object(config, "defaults", "Config")
+    profiles = get_object(config, "profiles", "Config")
+    default_headers = get_object(defaults, "headers", "Defaults")
+    entries = config.get("sources", [])
+    if not isinstance(entries, list):
+        raise ValueError(f"Config \"sources\" must be a list, got {entries!r}")
+
+    parsers = {}  # One engine per profile, shared by the sources that use it
+    sources = []
+    names = set()
+    outputs = {}  # Absolute output path -> source name, two sources must not write the same file
+
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Source {i} must be an object, got {entry!r}")
+        name = entry.get("name") or f"source-{i}"
+        if not isinstance(name, str):
+            raise ValueError(f"Source {i} name must be a string, got {name!r}")
+        if "url" not in entry:
+            raise ValueError(f"Source {name} has no url")
+        if not isinstance(entry["url"], str):
+            raise ValueError(f"Source {name} url must be a string, got {entry['url']!r}")
+        if name in names:
+            raise ValueError(f"Source name {name} is used twice")
+        names.add(name)
+
+        output = entry.get("output", f"{name}.jsonl")
+        if not isinstance(output, str) or not output:
+            raise ValueError(f"Source {name} output must be a file name, got {output!r}")
+        path = os.path.abspath(output)
+        if path in outputs:
+            raise ValueError(f"Sources {outputs[path]} and {name} both write to {output}")
+        outputs[path] = name
+
+        interval = entry.get("interval", defaults.get("interval", DEFAULT_INTERVAL))
+        if not is_number(interval) or interval <= 0:
+            raise ValueError(f"Source {name} interval must be a number of seconds above 0, got {interval!r}")
+        workers = entry.get("workers", defaults.get("workers", 1))
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            raise ValueError(f"Source {name} workers must be a whole number of at least 1, got {workers!r}")
+        headers = get_object(entry, "headers", f"Source {name}")
+
+        profile = entry.get("profile", defaults.get("profile", DEFAULT_PARSER))
+        if isinstance(profile, str) and profile in profiles:
+            profile = profiles[profile]
+        if not isinstance(profile, (str, dict)):
+            raise ValueError(f"Source {name} profile must be a name or an object, got {profile!r}")
+        key = json.dumps(profile, sort_keys=True)
+        if key not in parsers:
+            try:
+                parsers[key] = get_profile_parser(profile)
+            except KeyError:
+                raise ValueError(f"Source {name} has an unknown profile or engine: {profile}")
+
+        sources.append(Source(name, entry["url"], output, parsers[key], float(interval), workers,
+                              {**default_headers, **headers}))
+
+    if not sources:
+        raise ValueError(f"{config_file} lists no sources")
+
+    ttl_hours, max_entries = config.get("ttl_hours"), config.get("max_entries", MAX_ENTRIES)
+    if ttl_hours is not None and (not is_number(ttl_hours) or ttl_hours <= 0):
+        raise ValueError(f"Config \"ttl_hours\" must be a number above 0, got {ttl_hours!r}")
+    if not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 1:
+        raise ValueError(f"Config \"max_entries\" must be a whole number of at least 1, got {max_entries!r}")
+    if not isinstance(config.get("cache", CACHE_DB), str):
+        raise ValueError(f"Config \"cache\" must be a file name, got {config['cache']!r}")
+
+    rate_limits = get_object(config, "rate_limits", "Config")
+    limiter = DomainRateLimiter({domain: parse_rate_limit(limit, f"Rate limit of {domain}") for domain, limit in rate_limits.items()},
+                                parse_rate_limit(config["default_rate_limit"], "Default rate limit")
+                                if config.get("default_rate_limit") is not None else None)
+    return sources, limiter, config
+
+
+class Scheduler:
+    def __init__(self, sources, session, cache, concurrency=4, per_host=PER_HOST, timeout=TIMEOUT):
+        self.sources = {source.name: source for source in sources}
+        self.session = session
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.heap = []  # (next poll time, sequence, source name)
+        self.sequence = 0  # Breaks ties between sources due at the same time, first come first served
+        self.done = queue.Queue()  # (source name, result) of finished polls
+        self.stop_event = threading.Event()
+
+    def schedule(self, name, when):
+        heapq.heappush(self.heap, (when, self.sequence, name))
+        self.sequence += 1
+
+    def poll(self, source):
+        try:
+            result = scrape_trending_stories(source.url, source.output, self.cache, source.workers, self.per_host,
+                                             self.timeout, session=self.session, parser=source.parser,
+                                             request_headers=source.headers)
+        except Exception as error:  # A broken source must not stop the others
+            print(f"[{source.name}] poll failed: {error}")
+            result = None
+        self.done.put((source.name, result))
+
+    def stop(self):
+        self.stop_event.set()
+
+    # Poll every source on its interval until duration seconds have passed, stop() is called, or
+    # (with once) every source has been polled once. Returns {name: [result of each poll]}.
+    def run(self, duration=None, once=False):
+        start = time.monotonic()
+        deadline = start + duration if duration is not None else None
+        for name in self.sources:
+            self.schedule(name, start)
+
+        results = {name: [] for name in self.sources}
+        in_flight = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if deadline is not None and now >= deadline and in_flight == 0:
+                    break
+
+                # Start every due poll, as long as a pool worker is free and the run is not over
+                while (self.heap and self.heap[0][0] <= now and in_flight < self.concurrency
+                       and (deadline is None or now < deadline)):
+                    _, _, name = heapq.heappop(self.heap)
+                    in_flight += 1
+                    pool.submit(self.poll, self.sources[name])
+
+                if once and in_flight == 0 and not self.heap:
+                    break
+
+                # Sleep until the next poll is due or one finishes, whichever is first (waking up at
+                # least every second to notice stop())
+                wait = 1.0
+                if self.heap and in_flight < self.concurrency:
+                    wait = min(wait, self.heap[0][0] - now)
+                if deadline is not None and now < deadline:
+                    wait = min(wait, deadline - now)
+                try:
+                    name, result = self.done.get(timeout=max(wait, 0.001))
+                except queue.Empty:
+                    continue
+                in_flight -= 1
+                results[name].append(result)
+                if not once:
+                    source = self.sources[name]
+                    self.schedule(name, time.monotonic() + source.next_delay(result))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll many trending pages on a schedule, with per-domain rate limits")
+    parser.add_argument('-c', '--config', type=str, required=True, help='JSON config of sources, extractor profiles and rate limits')
+    parser.add_argument('--concurrency', type=int, default=4, help='Sources polled at the same time')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until interrupted)')
+    parser.add_argument('--once', action='store_true', help='Poll every source once and exit')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='Seconds to wait for each response')
+    parser.add_argument('--retries', type=int, default=RETRIES, help='Retries with exponential backoff for failed requests')
+    parser.add_argument('--per-host', type=int, default=PER_HOST, help='Most concurrent article requests to the same site per source')
+
+    args = parser.parse_args()
+    try:
+        sources, limiter, config = load_config(args.config)
+    except (OSError, ValueError) as error:
+        parser.error(f"Could not load {args.config}: {error}")
+
+    for source in sources:
+        if os.path.dirname(source.output):
+            os.makedirs(os.path.dirname(source.output), exist_ok=True)
+
+    # One connection pool for every source: enough connections for each domain's article workers
+    domains = {urlsplit(source.url).netloc for source in sources}
+    pool_size = max(len(domains), max(source.workers for source in sources) * args.concurrency, args.per_host)
+    session = make_session(pool_size, args.retries, limiter=limiter)
+
+    ttl = config["ttl_hours"] * 3600 if config.get("ttl_hours") is not None else None
+    cache = open_cache(config.get("cache", CACHE_DB), ttl, config.get("max_entries", MAX_ENTRIES))
+
+    scheduler = Scheduler(sources, session, cache, args.concurrency, args.per_host, args.timeout)
+    print(f"Polling {len(sources)} sources from {args.config}")
+    try:
+        results = scheduler.run(args.duration, args.once)
+    except KeyboardInterrupt:
+        scheduler.stop()
+        results = None
+    finally:
+        cache.close()
+
+    if results:
+        for name, polls in results.items():
+            print(f"{name}: {len(polls)} polls, {sum(1 for r in polls if r)} changed, {sum(1 for r in polls if r is None)} failed")
+
+if __name__ == "__main__":
+    main()
+
+# Run this script with python3 schedule_trending.py -c sources.json
+# Or a single round, e.g. from cron: python3 schedule_trending.py -c sources.json --once
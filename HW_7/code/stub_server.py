@@ -0,0 +1,153 @@
+import zlib
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Local stand-in for the Montreal Gazette, serving fixture HTML with the same structure the
+# scraper navigates: a trending carousel on the news page and one page per article
+
+ARTICLE_PATH = '/news/local-news/story-{}'
+
+
+# Page furniture around the content a real news page carries (menus, teasers, inline scripts),
+# so parse times are representative; each block is about 1 KB
+def filler_html(blocks):
+    return "".join(f'''
+    <section class="promo promo--{b % 7}" data-block="{b}">
+        <ul class="menu">{"".join(f'<li class="menu__item"><a href="/section/{b}/{j}">Section &amp; {j}</a></li>' for j in range(8))}</ul>
+        <div class="teaser"><h3>Teaser {b}</h3><p>Lorem ipsum <em>dolor</em> sit amet, consectetur adipiscing elit.</p></div>
+        <script>window.dataLayer = window.dataLayer || []; dataLayer.push({{"block": {b}}});</script>
+    </section>''' for b in range(blocks))
+
+
+# Fixture news page with `articles` stories in the trending carousel. Like the real page it
+# repeats a story (the duplicate is skipped) and has an item without a link and a sponsored
+# card whose class differs, which the scraper ignores.
+# Story IDs start at first, so different sections can carry different stories.
+def front_page_html(articles, filler=0, first=0):
+    items = []
+    for i in list(range(first, first + articles)) + [first]:
+        items.append(f'''
+        <li data-carousel-item="{i}">
+            <article class="article-card article-card--image-left article-card--hide-padlock">
+                <div class="article-card__content">
+                    <div class="article-card__details">
+                        <a class="article-card__link" href="{ARTICLE_PATH.format(i)}" aria-label="Story {i}"></a>
+                    </div>
+                </div>
+            </article>
+        </li>''')
+    items.append('''
+        <li data-carousel-item="placeholder"><article class="article-card article-card--image-left article-card--hide-padlock"></article></li>
+        <li data-carousel-item="sponsored">
+            <article class="article-card article-card--sponsored">
+                <div class="article-card__content"><div class="article-card__details">
+                    <a class="article-card__link" href="/sponsored/offer" aria-label="Sponsored"></a>
+                </div></div>
+            </article>
+        </li>''')
+    return f'<html><body><nav></nav>{filler_html(filler)}<ul class="carousel">{"".join(items)}\n</ul>{filler_html(filler)}</body></html>'
+
+
+# Fixture article page; odd stories use the wire-service author structure
+def article_page_html(i, filler=0):
+    if i % 2:
+        author = f'<div class="wire-published-by__authors">Wire Author {i}</div>'
+    else:
+        author = f'<span class="published-by__author"><a href="/author/{i}">Author {i}</a></span>'
+    return f'''<html><body>{filler_html(filler)}
+    <h1>Story {i}</h1>
+    <p class="article-subtitle">Blurb of story {i} &amp; more.</p>
+    {author}
+    <span class="published-date__since">Published Oct {i % 28 + 1}, 2024</span>
+    <p>Body text.</p>{filler_html(filler)}
+</body></html>'''
+
+
+# The handler reads its settings from the server, so a test can change server.articles (the
+# carousel) between polls. With server.volatile the front page embeds the time it was served
+# and sends no validators, like a page whose ads or clock change on every request. With
+# server.throttle set, each path is refused with 429 Too Many Requests that many times before
+# it is served, like a site pushing back on a crawler.
+def make_handler():
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server = self.server
+            time.sleep(server.latency)  # Simulated network round trip
+            with server.lock:
+                refused = server.refused.get(self.path, 0)
+                throttled = refused < server.throttle
+                if throttled:
+                    server.refused[self.path] = refused + 1
+            if throttled:
+                self.server.statuses.append((self.path, 429, time.monotonic()))
+                self.send_error(429)
+                return
+            volatile = False
+            if self.path.startswith('/category/'):
+                # Every section has its own stories: /category/news/ starts at story 0
+                section = self.path.split('/')[2]
+                first = 0 if section == 'news' else zlib.crc32(section.encode('utf-8')) % 1000 * 1000
+                body = front_page_html(server.articles, server.filler, first)
+                if server.volatile:
+                    body = body.replace('<nav></nav>', f'<nav>Served at {time.time()}</nav>')
+                    volatile = True
+            elif self.path.startswith(ARTICLE_PATH.format('')) and self.path.rsplit('-', 1)[-1].isdigit():
+                body = article_page_html(int(self.path.rsplit('-', 1)[-1]), server.filler)
+            else:
+                self.server.statuses.append((self.path, 404, time.monotonic()))
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            etag = f'"{hash(body) & 0xffffffff:08x}"'  # Same content, same validator
+            if not volatile and self.headers.get('If-None-Match') == etag:
+                self.server.statuses.append((self.path, 304, time.monotonic()))
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.server.statuses.append((self.path, 200, time.monotonic()))
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            if not volatile:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # Keep the benchmark output readable
+
+    return StubHandler
+
+
+# Start the stub server in a background thread; port 0 picks a free port. Returns the server
+# (call shutdown() when done) and the URL of its news page.
+def start_stub_server(articles=100, latency=0.05, port=0, filler=0, volatile=False):
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler())
+    server.daemon_threads = True
+    server.articles, server.latency, server.filler, server.volatile = articles, latency, filler, volatile
+    server.statuses = []  # (path, status, time) of every request served, for checking what was fetched and when
+    server.throttle, server.refused, server.lock = 0, {}, threading.Lock()  # 429s to send per path, and sent so far
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/category/news/'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fixture news and article pages locally for testing collect_trending.py")
+    parser.add_argument('-n', '--articles', type=int, default=100, help='Number of stories in the trending carousel')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds of simulated delay per response')
+    parser.add_argument('-p', '--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--filler', type=int, default=0, help='Blocks of page furniture (about 1 KB each) before and after the content of each page')
+    parser.add_argument('--volatile', action='store_true', help='Change the front page outside the carousel on every request, without validators')
+
+    args = parser.parse_args()
+    server, url = start_stub_server(args.articles, args.latency, args.port, args.filler, args.volatile)
+    print(f"Serving {args.articles} fixture articles at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+# Run this script with python3 stub_server.py -n 100, then python3 collect_trending.py -o trending.json -u http://127.0.0.1:8000/category/news/
@@ -1,6 +1,8 @@
 import argparse
 import random
 import json
+import os
+from reddit_stream import iter_posts
 
 def get_sample_idxs(n: int, num_posts: int) -> list:
     '''
@@ -16,11 +18,70 @@ def get_tsv_list(posts, sample_idxs: list[int]) -> list[str]:
     '''
     return [f"{posts[i]['data']['author_fullname']}\t{posts[i]['data']['title']}\t\n" for i in sample_idxs] # List comprehension
 
-def to_tsv(input: str, output: str, n: int):
+def reservoir_sample(posts, n: int) -> list:
+    '''
+    Keep a uniform random sample of n posts from a stream of unknown length,
+    holding at most n posts in memory at any time (reservoir sampling).
+    '''
+    reservoir = []
+    for seen, post in enumerate(posts):
+        if seen < n:
+            reservoir.append(post)
+        else:
+            j = random.randint(0, seen) # Replace an existing sample with probability n / (seen + 1)
+            if j < n:
+                reservoir[j] = post
+    return reservoir
+
+def post_to_tsv_line(post: dict) -> str:
+    '''
+    Format the author and title of a single post's data as a TSV line
+    '''
+    return f"{post.get('author_fullname', '')}\t{post.get('title', '')}\t\n"
+
+def stream_to_tsv(input: str, output: str, n: int):
+    '''
+    Streaming counterpart of to_tsv: posts are read one at a time so memory stays
+    bounded no matter how large the input is. Also accepts concatenated listings,
+    JSON Lines and gzip/zstd compressed inputs.
+    '''
+    # The existing output is only replaced once the input has been read successfully
+    tmp_output = None
+    try:
+        if n == -1: # Every post, written as soon as it is read, to a temporary file next to the output
+            tmp_output = f"{output}.{os.getpid()}.tmp"
+            with open(tmp_output, 'w') as tsv_out:
+                written = 0
+                for post in iter_posts(input):
+                    tsv_out.write(post_to_tsv_line(post))
+                    written += 1
+            os.replace(tmp_output, output)
+            tmp_output = None
+        else:
+            sample = reservoir_sample(iter_posts(input), n) # Fill the reservoir before touching the output, like to_tsv
+            with open(output, 'w') as tsv_out:
+                tsv_out.writelines(post_to_tsv_line(post) for post in sample)
+            written = len(sample)
+    except FileNotFoundError:
+        print(f"Error: The input file '{input}' was not found.")
+        return
+    except json.JSONDecodeError:
+        print("Error: Failed to parse JSON from the input file.")
+        return
+    finally:
+        if tmp_output is not None and os.path.exists(tmp_output): # Failed part way, drop the partial file
+            os.remove(tmp_output)
+
+    print(f"Wrote the data from {written} posts to {output}")
+
+def to_tsv(input: str, output: str, n: int, stream: bool = False):
     '''
     The worker / pipeline function that carries out the extraction procedure
     from an input JSON to an output TSV
     '''
+    if stream:
+        return stream_to_tsv(input, output, n) # Constant memory path for large archives
+
     try:
         with open(input, 'r') as json_raw:
             data = json.load(json_raw)
@@ -62,10 +123,11 @@ def main():
     parser.add_argument("-n", "--number", default=-1, type=int, help="The (positive) number of randomly selected posts to be saved in the output file, defaults to all posts.")
     # Note, by setting the default of an unspecified --number to be -1, we can look for this -1 later to know n was not provided
     # Since -1 is an invalid input for an argument that is expected to be a natural number in value.
+    parser.add_argument("--stream", action="store_true", help="Read the input incrementally with bounded memory (also accepts concatenated listings, JSON Lines and .gz/.zst files)")
 
     args = parser.parse_args()
 
-    to_tsv(args.input, args.output, args.number)
+    to_tsv(args.input, args.output, args.number, args.stream)
 
 
 if __name__ == "__main__":